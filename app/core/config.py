@@ -9,6 +9,12 @@ class Settings(BaseSettings):
     # Database
     mongodb_url: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     database_name: str = os.getenv("DATABASE_NAME", "personal_tutor")
+    mongodb_max_pool_size: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "200"))
+    mongodb_min_pool_size: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "20"))
+    mongodb_server_selection_timeout_ms: int = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "3000"))
+    # Wire compression, in order of preference; the server picks the first it supports.
+    # zstd needs the zstandard package; add "snappy" only with python-snappy installed
+    mongodb_compressors: str = os.getenv("MONGODB_COMPRESSORS", "zstd,zlib")
     
     # JWT
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "fallback_secret_key")
@@ -20,6 +26,8 @@ class Settings(BaseSettings):
     cloudinary_cloud_name: str = os.getenv("CLOUDINARY_CLOUD_NAME", "")
     cloudinary_api_key: str = os.getenv("CLOUDINARY_API_KEY", "")
     cloudinary_api_secret: str = os.getenv("CLOUDINARY_API_SECRET", "")
+    # Optional webhook Cloudinary calls when eager transformations finish
+    cloudinary_eager_notification_url: str = os.getenv("CLOUDINARY_EAGER_NOTIFICATION_URL", "")
     
     # Email (for future use)
     smtp_host: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
@@ -29,10 +37,15 @@ class Settings(BaseSettings):
 
     # LLM API
     google_api_key: str = os.getenv("GOOGLE_API_KEY", "")
+    rag_embed_batch_size: int = int(os.getenv("RAG_EMBED_BATCH_SIZE", "100"))
+    rag_embed_concurrency: int = int(os.getenv("RAG_EMBED_CONCURRENCY", "5"))
+    rag_embedding_cache_dir: str = os.getenv("RAG_EMBEDDING_CACHE_DIR", "embed_cache")
 
     # Weaviate
     weaviate_url: str = os.getenv("WEAVIATE_URL", "")
     weaviate_api_key: str = os.getenv("WEAVIATE_API_KEY", "")
+    weaviate_batch_size: int = int(os.getenv("WEAVIATE_BATCH_SIZE", "200"))
+    weaviate_concurrent_requests: int = int(os.getenv("WEAVIATE_CONCURRENT_REQUESTS", "4"))
 
     class Config:
         env_file = ".env"
@@ -16,6 +16,15 @@ def get_password_hash(password: str) -> str:
     """Generate password hash."""
     return pwd_context.hash(password)
 
+def session_claims(user: dict) -> dict:
+    """Build the token claims for a user document: id, email, role and token version."""
+    return {
+        "sub": str(user.get("_id", user.get("id"))),
+        "email": user.get("email"),
+        "role": "admin" if user.get("is_admin") else "user",
+        "ver": user.get("token_version", 0)
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token."""
     to_encode = data.copy()
@@ -24,7 +33,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"iat": datetime.utcnow(), "exp": expire, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
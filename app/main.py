@@ -1,19 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import cloudinary
 
-from app.core.config import settings
-from app.utils.database import create_indexes
+from app.utils.database import close_database, create_indexes
 from app.routers import auth, users, notes, questions, suggestions, analytics, pdfs  # Add pdfs here
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.cloudinary_cloud_name,
-    api_key=settings.cloudinary_api_key,
-    api_secret=settings.cloudinary_api_secret
-)
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
@@ -22,6 +14,7 @@ async def lifespan(app: FastAPI):
     print("Database indexes created")
     yield
     # Shutdown
+    close_database()
     print("Application shutting down")
 
 # Create FastAPI application
@@ -29,7 +22,8 @@ app = FastAPI(
     title="Personal Tutor API",
     description="A backend API for a personal tutor application where students can upload handwritten notes, receive feedback, and get personalized question suggestions.",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -5,13 +5,13 @@ from app.models.analytics import (
     AnalyticsOverview, WeakAreasResponse, SubjectProgress, 
     QuestionPattern, WeakAreasUpdate
 )
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, get_current_user_light
 from app.utils.database import get_database, get_object_id
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
 @router.get("/overview", response_model=AnalyticsOverview)
-async def get_analytics_overview(current_user: dict = Depends(get_current_user)):
+async def get_analytics_overview(current_user: dict = Depends(get_current_user_light)):
     """Get overall analytics overview for the user."""
     db = get_database()
     user_id = get_object_id(current_user["id"])
@@ -76,7 +76,7 @@ async def get_analytics_overview(current_user: dict = Depends(get_current_user))
     )
 
 @router.get("/weak-areas", response_model=List[WeakAreasResponse])
-async def get_weak_areas(current_user: dict = Depends(get_current_user)):
+async def get_weak_areas(current_user: dict = Depends(get_current_user_light)):
     """Get user's weak areas by subject."""
     db = get_database()
     user_id = get_object_id(current_user["id"])
@@ -96,7 +96,7 @@ async def get_weak_areas(current_user: dict = Depends(get_current_user)):
     return weak_areas
 
 @router.get("/progress/{subject}", response_model=SubjectProgress)
-async def get_subject_progress(subject: str, current_user: dict = Depends(get_current_user)):
+async def get_subject_progress(subject: str, current_user: dict = Depends(get_current_user_light)):
     """Get detailed progress for a specific subject."""
     db = get_database()
     user_id = get_object_id(current_user["id"])
@@ -162,7 +162,7 @@ async def get_subject_progress(subject: str, current_user: dict = Depends(get_cu
     )
 
 @router.get("/question-patterns", response_model=List[QuestionPattern])
-async def get_question_patterns(current_user: dict = Depends(get_current_user)):
+async def get_question_patterns(current_user: dict = Depends(get_current_user_light)):
     """Get question patterns and types for the user."""
     db = get_database()
     user_id = get_object_id(current_user["id"])
@@ -6,10 +6,10 @@ from app.models.user import (
 )
 from app.core.security import (
     get_password_hash, verify_password, 
-    create_access_token, create_refresh_token, verify_token
+    create_access_token, create_refresh_token, verify_token, session_claims
 )
-from app.utils.database import get_database, serialize_object_id
-from app.utils.auth import get_current_user
+from app.utils.database import get_database, get_object_id, serialize_object_id
+from app.utils.auth import get_current_user, invalidate_cached_user
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
@@ -63,8 +63,9 @@ async def login_user(user: UserLogin):
         )
     
     # Create tokens
-    access_token = create_access_token(data={"sub": str(db_user["_id"])})
-    refresh_token = create_refresh_token(data={"sub": str(db_user["_id"])})
+    claims = session_claims(db_user)
+    access_token = create_access_token(data=claims)
+    refresh_token = create_refresh_token(data={"sub": claims["sub"], "ver": claims["ver"]})
     
     return {
         "access_token": access_token,
@@ -84,9 +85,22 @@ async def refresh_token(token_data: TokenRefresh):
             detail="Invalid refresh token"
         )
     
+    # Reload the claims and reject refresh tokens revoked by a logout
+    db = get_database()
+    db_user = await db.users.find_one(
+        {"_id": get_object_id(user_id)},
+        projection={"email": 1, "is_admin": 1, "token_version": 1}
+    )
+    if db_user is None or payload.get("ver", 0) != db_user.get("token_version", 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    
     # Create new tokens
-    access_token = create_access_token(data={"sub": user_id})
-    new_refresh_token = create_refresh_token(data={"sub": user_id})
+    claims = session_claims(db_user)
+    access_token = create_access_token(data=claims)
+    new_refresh_token = create_refresh_token(data={"sub": user_id, "ver": claims["ver"]})
     
     return {
         "access_token": access_token,
@@ -96,8 +110,13 @@ async def refresh_token(token_data: TokenRefresh):
 
 @router.post("/logout")
 async def logout_user(current_user: dict = Depends(get_current_user)):
-    """Logout user (placeholder for token blacklisting)."""
-    # In a production app, you would blacklist the token here
+    """Logout user, revoking all of their current tokens."""
+    db = get_database()
+    await db.users.update_one(
+        {"_id": get_object_id(current_user["id"])},
+        {"$inc": {"token_version": 1}}
+    )
+    invalidate_cached_user(current_user["id"])
     return {"message": "Successfully logged out"}
 
 @router.post("/forgot-password")
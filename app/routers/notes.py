@@ -2,13 +2,15 @@ from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File,
 from datetime import datetime
 from typing import List
 from app.models.note import NoteResponse, NoteUpdate, NoteWithQuestions, SubjectStats
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, get_current_user_light
 from app.utils.database import get_database, get_object_id, serialize_object_id
 from app.utils.cloudinary_utils import upload_image_to_cloudinary, delete_image_from_cloudinary
-import pdb
+from app.utils.responses import MongoJSONResponse, document_rows, response_projection
 
 router = APIRouter(prefix="/api/notes", tags=["Notes"])
 
+_NOTE_PROJECTION = response_projection(NoteResponse)
+
 @router.post("/upload", response_model=NoteResponse)
 async def upload_note(
     file: UploadFile = File(...),
@@ -21,7 +23,6 @@ async def upload_note(
     db = get_database()
     
     try:
-        pdb.set_trace()
         # Upload image to Cloudinary
         upload_result = await upload_image_to_cloudinary(file, folder="notes")
         
@@ -56,18 +57,21 @@ async def upload_note(
         )
 
 @router.get("", response_model=List[NoteResponse])
-async def get_user_notes(current_user: dict = Depends(get_current_user)):
+async def get_user_notes(current_user: dict = Depends(get_current_user_light)):
     """Get all notes for the current user."""
     db = get_database()
     
     notes = await db.notes.find(
-        {"user_id": get_object_id(current_user["id"])}
+        {"user_id": get_object_id(current_user["id"])},
+        projection=_NOTE_PROJECTION
     ).sort("upload_date", -1).to_list(None)
     
-    return [serialize_object_id(note) for note in notes]
+    # Rows already have exactly the NoteResponse fields, so skip per-row model
+    # validation and let orjson encode them, ObjectIds included
+    return MongoJSONResponse(document_rows(notes, NoteResponse))
 
 @router.get("/{note_id}", response_model=NoteResponse)
-async def get_note_by_id(note_id: str, current_user: dict = Depends(get_current_user)):
+async def get_note_by_id(note_id: str, current_user: dict = Depends(get_current_user_light)):
     """Get a specific note by ID."""
     db = get_database()
     
@@ -169,7 +173,7 @@ async def delete_note(note_id: str, current_user: dict = Depends(get_current_use
         )
 
 @router.get("/subjects", response_model=List[str])
-async def get_user_subjects(current_user: dict = Depends(get_current_user)):
+async def get_user_subjects(current_user: dict = Depends(get_current_user_light)):
     """Get all subjects for the current user."""
     db = get_database()
     
@@ -183,7 +187,7 @@ async def get_user_subjects(current_user: dict = Depends(get_current_user)):
     return [subject["_id"] for subject in subjects]
 
 @router.get("/by-subject/{subject}", response_model=List[NoteResponse])
-async def get_notes_by_subject(subject: str, current_user: dict = Depends(get_current_user)):
+async def get_notes_by_subject(subject: str, current_user: dict = Depends(get_current_user_light)):
     """Get all notes for a specific subject."""
     db = get_database()
     
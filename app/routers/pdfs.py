@@ -66,7 +66,12 @@ async def upload_pdf(
         logger.info("Initializing RAG manager...")
         rag_manager = RAGManager(api_key=settings.google_api_key, 
                                  weaviate_url=settings.weaviate_url,
-                                 weaviate_api_key=settings.weaviate_api_key)
+                                 weaviate_api_key=settings.weaviate_api_key,
+                                 insert_batch_size=settings.weaviate_batch_size,
+                                 insert_concurrent_requests=settings.weaviate_concurrent_requests,
+                                 embed_batch_size=settings.rag_embed_batch_size,
+                                 embed_concurrency=settings.rag_embed_concurrency,
+                                 embedding_cache_dir=settings.rag_embedding_cache_dir)
         
         logger.info("Loading PDF with board info...")
         rag_manager.load_pdf_with_board(
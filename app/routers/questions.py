@@ -5,11 +5,14 @@ from app.models.question import (
     QuestionCreate, QuestionResponse, QuestionUpdate, 
     FeedbackCreate, FeedbackResponse, QuestionWithFeedback
 )
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, get_current_user_light
 from app.utils.database import get_database, get_object_id, serialize_object_id
+from app.utils.responses import MongoJSONResponse, document_rows, response_projection
 
 router = APIRouter(prefix="/api/questions", tags=["Questions"])
 
+_QUESTION_PROJECTION = response_projection(QuestionResponse)
+
 @router.post("", response_model=QuestionResponse)
 async def create_question(
     question: QuestionCreate, 
@@ -51,18 +54,21 @@ async def create_question(
     return serialize_object_id(question_data)
 
 @router.get("", response_model=List[QuestionResponse])
-async def get_user_questions(current_user: dict = Depends(get_current_user)):
+async def get_user_questions(current_user: dict = Depends(get_current_user_light)):
     """Get all questions for the current user."""
     db = get_database()
     
     questions = await db.questions.find(
-        {"user_id": get_object_id(current_user["id"])}
+        {"user_id": get_object_id(current_user["id"])},
+        projection=_QUESTION_PROJECTION
     ).sort("created_at", -1).to_list(None)
     
-    return [serialize_object_id(question) for question in questions]
+    # Rows already have exactly the QuestionResponse fields, so skip per-row
+    # model validation and let orjson encode them, ObjectIds included
+    return MongoJSONResponse(document_rows(questions, QuestionResponse))
 
 @router.get("/{question_id}", response_model=QuestionResponse)
-async def get_question_by_id(question_id: str, current_user: dict = Depends(get_current_user)):
+async def get_question_by_id(question_id: str, current_user: dict = Depends(get_current_user_light)):
     """Get a specific question by ID."""
     db = get_database()
     
@@ -151,7 +157,7 @@ async def delete_question(question_id: str, current_user: dict = Depends(get_cur
     return {"message": "Question deleted successfully"}
 
 @router.get("/by-note/{note_id}", response_model=List[QuestionResponse])
-async def get_questions_by_note(note_id: str, current_user: dict = Depends(get_current_user)):
+async def get_questions_by_note(note_id: str, current_user: dict = Depends(get_current_user_light)):
     """Get all questions for a specific note."""
     db = get_database()
     
@@ -209,7 +215,7 @@ async def add_feedback(
     return serialize_object_id(feedback_data)
 
 @router.get("/{question_id}/feedback", response_model=List[FeedbackResponse])
-async def get_question_feedback(question_id: str, current_user: dict = Depends(get_current_user)):
+async def get_question_feedback(question_id: str, current_user: dict = Depends(get_current_user_light)):
     """Get all feedback for a question."""
     db = get_database()
     
@@ -4,11 +4,10 @@ from typing import List, Optional
 import uuid
 import tempfile
 import os
-import pdb
 
 from app.models.question import SuggestedQuestionResponse
 from app.models.suggestion import AssignmentEvaluationResponse, Hint, EvaluationResult, SuggestedQuestion
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, get_current_user_light
 from app.utils.database import get_database, get_object_id, serialize_object_id
 from app.utils.cloudinary_utils import upload_image_to_cloudinary
 from app.study_agent.rag_utils import RAGManager
@@ -179,7 +178,7 @@ async def evaluate_assignment(
                 print(f"Warning: Could not delete temp file {temp_image_path}: {e}")
 
 @router.get("/evaluations", response_model=List[AssignmentEvaluationResponse])
-async def get_assignment_evaluations(current_user: dict = Depends(get_current_user)):
+async def get_assignment_evaluations(current_user: dict = Depends(get_current_user_light)):
     """Get all assignment evaluations for the current user."""
     db = get_database()
     user_id = get_object_id(current_user["id"])
@@ -193,7 +192,7 @@ async def get_assignment_evaluations(current_user: dict = Depends(get_current_us
 @router.get("/evaluations/{evaluation_id}", response_model=AssignmentEvaluationResponse)
 async def get_assignment_evaluation(
     evaluation_id: str, 
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user_light)
 ):
     """Get a specific assignment evaluation."""
     db = get_database()
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
 from datetime import datetime, timedelta
 from typing import List
 from app.models.user import UserResponse, UserUpdate, UserStats
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, invalidate_cached_user
 from app.utils.database import get_database, get_object_id, serialize_object_id
 from app.utils.cloudinary_utils import upload_image_to_cloudinary, delete_image_from_cloudinary
 
@@ -38,6 +38,7 @@ async def update_user_profile(
         {"_id": get_object_id(current_user["id"])},
         {"$set": update_data}
     )
+    invalidate_cached_user(current_user["id"])
     
     # Return updated user
     updated_user = await db.users.find_one({"_id": get_object_id(current_user["id"])})
@@ -71,6 +72,7 @@ async def update_profile_picture(
                 }
             }
         )
+        invalidate_cached_user(current_user["id"])
         
         return {
             "message": "Profile picture updated successfully",
@@ -140,6 +142,7 @@ async def delete_user_account(current_user: dict = Depends(get_current_user)):
         
         # Delete all user data
         await db.users.delete_one({"_id": user_id})
+        invalidate_cached_user(current_user["id"])
         await db.notes.delete_many({"user_id": user_id})
         await db.questions.delete_many({"user_id": user_id})
         await db.suggested_questions.delete_many({"user_id": user_id})
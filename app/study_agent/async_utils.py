@@ -0,0 +1,19 @@
+"""
+Helpers for driving asyncio code from the synchronous parts of the educational tutor system
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+def run_coroutine(coro):
+    """
+    Run a coroutine to completion from synchronous code
+    
+    Uses asyncio.run directly, or a worker thread when called from inside a
+    running event loop (e.g. a FastAPI request handler).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
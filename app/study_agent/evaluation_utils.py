@@ -2,10 +2,11 @@
 Evaluation utility for checking and scoring student solutions
 """
 import google.generativeai as genai
-import os
 from typing import Dict, Any, Optional
-import json
 import logging
+from app.study_agent.prompts import PromptFormatter
+from app.study_agent.schemas import EVALUATION_RESULT_SCHEMA, EvaluationResult
+from app.study_agent.gemini_utils import ensure_configured, generate_content, get_model
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,75 +27,31 @@ def evaluate_solution(problem_statement: str, student_solution: str, context: st
     """
     try:
         # Configure API key
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
+        ensure_configured(api_key)
         
-        model = genai.GenerativeModel("gemini-1.5-pro")
+        model = get_model()
         
         # Create comprehensive evaluation prompt
-        prompt = f"""
-        You are an expert Class 5 mathematics teacher evaluating a student's solution.
-        
-        PROBLEM: {problem_statement}
-        
-        STUDENT'S SOLUTION: {student_solution}
-        
-        RELEVANT CONTEXT (from textbook): {context if context else "No additional context available"}
-        
-        Please evaluate the student's solution and provide:
-        
-        1. CORRECTNESS: Is the final answer correct? (true/false)
-        2. SCORE: Rate the solution from 0-10 based on:
-           - Correct final answer (40% weight)
-           - Correct method/approach (30% weight)
-           - Clear working/steps shown (20% weight)
-           - Neat presentation (10% weight)
-        3. CORRECT_ANSWER: What is the correct final answer?
-        4. EXPLANATION: Detailed explanation including:
-           - What the student did right
-           - What mistakes were made (if any)
-           - Step-by-step correct solution
-           - Learning points for improvement
+        prompt = PromptFormatter.get_evaluation_prompt(problem_statement, student_solution, context)
         
-        Return your response as a JSON object with this exact format:
-        {{
-            "is_correct": boolean,
-            "score": integer (0-10),
-            "correct_answer": "correct final answer as string",
-            "explanation": "detailed explanation with correct solution steps",
-            "student_strengths": ["list", "of", "things", "done", "well"],
-            "areas_for_improvement": ["list", "of", "areas", "to", "improve"],
-            "method_used": "description of method student attempted to use"
-        }}
-        
-        Be encouraging and constructive in your feedback, suitable for a Class 5 student.
-        """
-        
-        response = model.generate_content(prompt)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=EVALUATION_RESULT_SCHEMA
+            )
+        )
         
         if response.text:
             try:
-                # Parse JSON response
-                result = json.loads(response.text.strip())
-                
-                # Validate required fields
-                required_fields = ["is_correct", "score", "correct_answer", "explanation"]
-                for field in required_fields:
-                    if field not in result:
-                        logger.warning(f"Missing field {field} in evaluation response")
-                        result[field] = get_default_value(field)
-                
-                # Ensure score is within valid range
-                result["score"] = max(0, min(10, int(result["score"])))
+                # Parses and validates in one pass; ValidationError is a ValueError
+                result = EvaluationResult.model_validate_json(response.text).model_dump()
                 
                 logger.info(f"Successfully evaluated solution. Score: {result['score']}/10")
                 return result
                 
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 logger.error(f"Could not parse JSON response: {e}")
                 return create_fallback_evaluation(problem_statement, student_solution, response.text)
         else:
@@ -197,14 +154,9 @@ def quick_check_answer(problem_statement: str, student_answer: str, api_key: Opt
         bool: True if answer is correct
     """
     try:
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
+        ensure_configured(api_key)
         
-        model = genai.GenerativeModel("gemini-1.5-pro")
+        model = get_model()
         
         prompt = f"""
         Quick check: Is the student's answer correct for this Class 5 math problem?
@@ -215,7 +167,7 @@ def quick_check_answer(problem_statement: str, student_answer: str, api_key: Opt
         Respond with only "CORRECT" or "INCORRECT"
         """
         
-        response = model.generate_content(prompt)
+        response = generate_content(model, prompt)
         
         if response.text:
             return "CORRECT" in response.text.upper()
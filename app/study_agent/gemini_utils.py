@@ -0,0 +1,134 @@
+"""
+Shared Gemini setup for the educational tutor system
+
+genai.configure rewires global client state, and building a GenerativeModel
+re-parses its configuration, so both are done once and reused across calls.
+"""
+import os
+import inspect
+import logging
+import threading
+from functools import lru_cache, wraps
+from typing import Optional
+import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+logger = logging.getLogger(__name__)
+
+# Gemini 2.5 models cache long shared prompt prefixes implicitly, which is why
+# prompts put their fixed instructions first and the per-request text last
+DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
+GENERATE_MAX_ATTEMPTS = 3
+
+# Key genai is currently configured with; None until the first call
+_configured_key: Optional[str] = None
+_configure_lock = threading.Lock()
+
+def ensure_configured(api_key: Optional[str] = None):
+    """
+    Configure genai with the given key, or GOOGLE_API_KEY, unless already done
+
+    Args:
+        api_key (str, optional): Google API key
+
+    Raises:
+        ValueError: If no key is given and GOOGLE_API_KEY is not set
+    """
+    global _configured_key
+
+    api_key = api_key or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("Google API key not provided")
+    if api_key == _configured_key:
+        return
+
+    # Concurrent fan-out calls (asyncio.to_thread) must not configure twice or
+    # use a model cached against the previous client
+    with _configure_lock:
+        if api_key == _configured_key:
+            return
+        genai.configure(api_key=api_key)
+        # Models bind to the client that was current when first used
+        get_model.cache_clear()
+        _configured_key = api_key
+    logger.info("Configured Gemini client")
+
+@lru_cache(maxsize=4)
+def get_model(name: str = DEFAULT_MODEL) -> genai.GenerativeModel:
+    """
+    Get a shared GenerativeModel instance
+
+    Args:
+        name (str): Gemini model name
+
+    Returns:
+        genai.GenerativeModel: Model bound to the configured client
+    """
+    return genai.GenerativeModel(name)
+
+@retry(
+    stop=stop_after_attempt(GENERATE_MAX_ATTEMPTS),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    retry=retry_if_exception_type((ResourceExhausted, ServiceUnavailable)),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+def generate_content(model: genai.GenerativeModel, *args, **kwargs):
+    """
+    Call model.generate_content, retrying rate-limit (429) and unavailable (503)
+    errors with jittered exponential backoff
+
+    Args:
+        model (genai.GenerativeModel): Model to call
+        *args: Positional arguments for generate_content
+        **kwargs: Keyword arguments for generate_content
+
+    Returns:
+        GenerateContentResponse: Model response
+    """
+    return model.generate_content(*args, **kwargs)
+
+class _UnconfiguredModel:
+    """Stand-in model that raises the configuration error when used"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def generate_content(self, *args, **kwargs):
+        raise self.error
+
+def with_gemini(model_name: str = DEFAULT_MODEL):
+    """
+    Configure genai from the call's api_key argument and inject the shared model
+
+    The decorated function takes a ``model`` keyword argument. When no API key
+    is available the injected model raises the ValueError on first use, so the
+    function's own error handling still produces its fallback result.
+
+    Args:
+        model_name (str): Gemini model name
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            api_key = signature.bind_partial(*args, **kwargs).arguments.get("api_key")
+            try:
+                ensure_configured(api_key)
+                model = get_model(model_name)
+            except ValueError as e:
+                model = _UnconfiguredModel(e)
+            return func(*args, model=model, **kwargs)
+        return wrapper
+    return decorator
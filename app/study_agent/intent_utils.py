@@ -2,10 +2,12 @@
 Intent detection utility for determining if student wants evaluation or solution
 """
 import google.generativeai as genai
-import os
 from typing import Tuple, Optional
 import logging
-import json
+from pydantic import ValidationError
+from app.study_agent.prompts import PromptFormatter
+from app.study_agent.schemas import INTENT_SPLIT_SCHEMA, IntentSplit
+from app.study_agent.gemini_utils import ensure_configured, generate_content, get_model
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,57 +25,7 @@ def detect_intent(extracted_text: str, student_prompt: Optional[str] = None, api
     Returns:
         str: "evaluation" or "solve"
     """
-    try:
-        # Configure API key
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
-        
-        # Initialize model
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        
-        # Create comprehensive prompt for intent detection
-        prompt = f"""
-        You are an AI tutor for Class 5 math students. Analyze the following content to determine the student's intent.
-        
-        Extracted text from image: "{extracted_text}"
-        Student prompt (if any): "{student_prompt or 'None provided'}"
-        
-        Determine if the student wants:
-        1. EVALUATION: Student has provided their solution and wants it checked/graded
-        2. SOLVE: Student wants the AI to solve the problem step-by-step
-        
-        Guidelines for classification:
-        - If the extracted text contains a student's work, calculations, or answers, classify as "evaluation"
-        - If student prompt contains phrases like "check my answer", "is this correct", "grade this", classify as "evaluation"
-        - If the extracted text only contains the problem statement without solutions, classify as "solve"
-        - If student prompt contains phrases like "solve this", "help me solve", "how to do this", classify as "solve"
-        - If unclear, default to "solve"
-        
-        Return ONLY one word: either "evaluation" or "solve"
-        """
-        
-        response = model.generate_content(prompt)
-        
-        if response.text:
-            intent = response.text.strip().lower()
-            if intent in ["evaluation", "solve"]:
-                logger.info(f"Detected intent: {intent}")
-                return intent
-            else:
-                logger.warning(f"Unclear intent detected, defaulting to 'solve'. Response: {response.text}")
-                return "solve"
-        else:
-            logger.warning("No response from model, defaulting to 'solve'")
-            return "solve"
-            
-    except Exception as e:
-        logger.error(f"Error in intent detection: {str(e)}")
-        # Default to solve if there's an error
-        return "solve"
+    return detect_intent_and_split(extracted_text, student_prompt, api_key)["intent"]
 
 def extract_problem_and_solution(extracted_text: str, api_key: Optional[str] = None) -> Tuple[str, Optional[str]]:
     """
@@ -86,57 +38,59 @@ def extract_problem_and_solution(extracted_text: str, api_key: Optional[str] = N
     Returns:
         Tuple[str, Optional[str]]: (problem_statement, student_solution)
     """
+    result = detect_intent_and_split(extracted_text, api_key=api_key)
+    return result["problem_statement"], result["student_solution"]
+
+def detect_intent_and_split(extracted_text: str, student_prompt: Optional[str] = None, api_key: Optional[str] = None) -> dict:
+    """
+    Detect intent and separate problem from student solution in a single model call
+    
+    Args:
+        extracted_text (str): Text extracted from the image
+        student_prompt (str, optional): Optional student input/prompt
+        api_key (str, optional): Google API key
+    
+    Returns:
+        dict: {"intent", "problem_statement", "student_solution"}
+    """
+    fallback = {"intent": "solve", "problem_statement": extracted_text, "student_solution": None}
     try:
         # Configure API key
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
-        
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        
-        prompt = f"""
-        You are analyzing text extracted from a Class 5 math problem image. 
-        
-        Extracted text: "{extracted_text}"
+        ensure_configured(api_key)
         
-        Please separate the content into:
-        1. Problem statement (the actual math question)
-        2. Student solution (any work, calculations, or answers provided by the student)
+        model = get_model()
         
-        Return your response as a JSON object with this exact format:
-        {{
-            "problem_statement": "the math problem question",
-            "student_solution": "student's work and answer if present, or null if not present"
-        }}
+        prompt = PromptFormatter.get_intent_and_split_prompt(extracted_text, student_prompt)
         
-        If no student solution is visible, set student_solution to null.
-        """
-        
-        response = model.generate_content(prompt)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=INTENT_SPLIT_SCHEMA
+            )
+        )
         
         if response.text:
             try:
-                # Try to parse JSON response
-                result = json.loads(response.text.strip())
-                problem = result.get("problem_statement", extracted_text)
-                solution = result.get("student_solution")
-                
-                logger.info("Successfully extracted problem and solution components")
-                return problem, solution
-                
-            except json.JSONDecodeError:
-                logger.warning("Could not parse JSON response, returning original text")
-                return extracted_text, None
+                result = IntentSplit.model_validate_json(response.text)
+            except ValidationError:
+                logger.warning(f"Response did not match the intent schema, defaulting to 'solve'. Response: {response.text}")
+                return fallback
+            
+            logger.info(f"Detected intent: {result.intent}")
+            return {
+                "intent": result.intent,
+                "problem_statement": result.problem_statement or extracted_text,
+                "student_solution": result.student_solution
+            }
         else:
-            logger.warning("No response from model")
-            return extracted_text, None
+            logger.warning("No response from model, defaulting to 'solve'")
+            return fallback
             
     except Exception as e:
-        logger.error(f"Error extracting problem and solution: {str(e)}")
-        return extracted_text, None
+        logger.error(f"Error in combined intent detection: {str(e)}")
+        return fallback
 
 def analyze_intent_with_context(extracted_text: str, student_prompt: Optional[str] = None, api_key: Optional[str] = None) -> dict:
     """
@@ -150,12 +104,6 @@ def analyze_intent_with_context(extracted_text: str, student_prompt: Optional[st
     Returns:
         dict: Complete intent analysis result
     """
-    intent = detect_intent(extracted_text, student_prompt, api_key)
-    problem, solution = extract_problem_and_solution(extracted_text, api_key)
-    
-    return {
-        "intent": intent,
-        "problem_statement": problem,
-        "student_solution": solution,
-        "has_student_work": solution is not None
-    }
+    result = detect_intent_and_split(extracted_text, student_prompt, api_key)
+    result["has_student_work"] = result["student_solution"] is not None
+    return result
@@ -85,26 +85,10 @@ class EducationalTutorAgent:
         logger.info(f"Educational Tutor Agent initialized successfully for {board} board")
     
     def _initialize_rag_manager(self):
-        """Initialize RAG manager if vectorstore exists"""
+        """Initialize RAG manager backed by the Weaviate collection"""
         try:
-            # Try to initialize RAG manager and load existing vectorstore
             self.rag_manager = RAGManager(api_key=self.api_key)
-            
-            # Try to load existing vectorstore
-            vectorstore = self.rag_manager.load_vectorstore()
-            if vectorstore:
-                self.rag_manager.vectorstore = vectorstore
-                self.rag_manager.retriever = vectorstore.as_retriever(
-                    search_type="mmr",
-                    search_kwargs={
-                        "k": 5,
-                        "fetch_k": 10,
-                        "lambda_mult": 0.7
-                    }
-                )
-                logger.info("Loaded existing vectorstore successfully")
-            else:
-                logger.warning("No existing vectorstore found. RAG context will be limited.")
+            logger.info("RAG manager initialized successfully")
                 
         except Exception as e:
             logger.warning(f"Could not initialize RAG manager: {e}")
@@ -0,0 +1,193 @@
+"""
+Response cache for Gemini calls in the educational tutor system
+
+Two tiers sit in front of the model: an exact-match LRU keyed on the
+normalized prompt inputs, and a semantic tier that reuses the answer to a
+reworded version of the same problem. Math problems that differ only in
+their numbers or operators ("8 + 6" vs "8 - 6") have near-identical
+embeddings but different answers, so semantic matches are only considered
+between problems with the same numbers and the same operator sequence.
+Inputs that must match exactly, such as the RAG context, are passed as a
+scope: they are part of the exact key and the bucket, but not embedded.
+"""
+import copy
+import functools
+import hashlib
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import google.generativeai as genai
+from cachetools import LRUCache, TTLCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+(?:[.,/]\d+)*")
+# Arithmetic operators, as symbols or words; applied after numbers are removed
+# so the "/" of a fraction is not mistaken for division
+_OPERATOR_RE = re.compile(
+    r"[+\-−–×*÷/^%=<>]|\b(?:plus|minus|times|multipl\w*|divid\w*|sum|difference|product|"
+    r"quotient|add\w*|subtract\w*|less|more|fewer|twice|double|half|percent|remainder|x)\b"
+)
+
+def normalize_text(text: str) -> str:
+    """Lower-case text and collapse runs of whitespace"""
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+def bucket_key(text: str, scope: str = "") -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+    """Semantic bucket of a normalized text: its scope, numbers and operators, in order"""
+    numbers = _NUMBER_RE.findall(text)
+    operators = _OPERATOR_RE.findall(_NUMBER_RE.sub(" ", text))
+    scope_digest = hashlib.sha256(scope.encode("utf-8")).hexdigest() if scope else ""
+    return scope_digest, tuple(numbers), tuple(operators)
+
+def embed_text(text: str) -> np.ndarray:
+    """Embed text with the Gemini embedding model as a unit-length float32 vector"""
+    vector = np.asarray(
+        genai.embed_content(model="models/embedding-001", content=text, task_type="semantic_similarity")["embedding"],
+        dtype=np.float32
+    )
+    return vector / np.linalg.norm(vector)
+
+class SemanticCache:
+    """Exact-match LRU with a semantic fallback for reworded problems"""
+
+    def __init__(self, maxsize: int = 1024, similarity_threshold: float = 0.85,
+                 embed_fn: Optional[Callable[[str], np.ndarray]] = embed_text,
+                 ttl: Optional[float] = None):
+        """
+        Initialize the cache
+
+        Args:
+            maxsize (int): Maximum number of cached responses
+            similarity_threshold (float): Minimum cosine similarity for a semantic hit
+            embed_fn (Callable, optional): Maps text to a unit-length vector; None
+                disables the semantic tier for cheap calls not worth an embedding
+            ttl (float, optional): Seconds before a cached response expires
+        """
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+        self.maxsize = maxsize
+        self._exact = TTLCache(maxsize=maxsize, ttl=ttl) if ttl else LRUCache(maxsize=maxsize)
+        # Embedded keys grouped by bucket_key; entries whose exact response was
+        # evicted or expired are swept out in set()
+        self._semantic: Dict[Tuple, List[Tuple[np.ndarray, str]]] = {}
+        self._semantic_size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(text: str, scope: str = "") -> str:
+        return hashlib.sha256(f"{scope}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str, scope: str = "") -> Tuple[Any, Optional[np.ndarray]]:
+        """
+        Look up a cached response
+
+        Args:
+            text (str): Normalized cache key text
+            scope (str): Inputs that must match exactly; not embedded
+
+        Returns:
+            Tuple[Any, Optional[np.ndarray]]: Cached value (None on a miss) and the
+            key's embedding, if one was computed, for reuse by set()
+        """
+        digest = self._digest(text, scope)
+        with self._lock:
+            value = self._exact.get(digest)
+            candidates = [
+                entry for entry in self._semantic.get(bucket_key(text, scope), ())
+                if entry[1] in self._exact
+            ] if self.embed_fn is not None else []
+        if value is not None:
+            logger.info("LLM cache hit (exact)")
+            return value, None
+        if not candidates:
+            return None, None
+
+        try:
+            vector = self.embed_fn(text)
+        except Exception as e:
+            logger.debug("Skipping semantic cache lookup: %s", e)
+            return None, None
+
+        similarities = np.stack([candidate for candidate, _ in candidates]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.similarity_threshold:
+            with self._lock:
+                value = self._exact.get(candidates[best][1])
+            if value is not None:
+                logger.info(f"LLM cache hit (semantic, similarity {similarities[best]:.3f})")
+                return value, vector
+        return None, vector
+
+    def set(self, text: str, value: Any, vector: Optional[np.ndarray] = None, scope: str = ""):
+        """
+        Store a response
+
+        Args:
+            text (str): Normalized cache key text
+            value (Any): Response to cache
+            vector (np.ndarray, optional): Embedding of text, if already computed
+            scope (str): Inputs that must match exactly; not embedded
+        """
+        digest = self._digest(text, scope)
+        if vector is None and self.embed_fn is not None:
+            try:
+                vector = self.embed_fn(text)
+            except Exception as e:
+                logger.debug("Caching without semantic entry: %s", e)
+
+        with self._lock:
+            self._exact[digest] = value
+            if vector is not None:
+                self._semantic.setdefault(bucket_key(text, scope), []).append((vector, digest))
+                self._semantic_size += 1
+                if self._semantic_size > 2 * self.maxsize:
+                    self._sweep()
+
+    def _sweep(self):
+        """Drop semantic entries, and empty buckets, whose exact response is gone; lock held"""
+        for key in list(self._semantic):
+            bucket = [entry for entry in self._semantic[key] if entry[1] in self._exact]
+            if bucket:
+                self._semantic[key] = bucket
+            else:
+                del self._semantic[key]
+        self._semantic_size = sum(len(bucket) for bucket in self._semantic.values())
+
+def semantic_cache(cache: SemanticCache, key_fn: Callable[..., str],
+                   should_cache: Callable[[Any], bool] = lambda result: True,
+                   scope_fn: Optional[Callable[..., str]] = None):
+    """
+    Decorate an LLM-backed function with a SemanticCache
+
+    Args:
+        cache (SemanticCache): Cache to read and populate
+        key_fn (Callable[..., str]): Builds the cache key from the call's arguments;
+            this is the text that gets embedded, so keep it to the problem itself
+        scope_fn (Callable[..., str], optional): Builds the part of the key that
+            must match exactly (context, counts) from the call's arguments
+        should_cache (Callable[[Any], bool]): Returns False for results that must not
+            be cached, such as fallbacks produced after an API error
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = normalize_text(key_fn(*args, **kwargs))
+            scope = scope_fn(*args, **kwargs) if scope_fn else ""
+            value, vector = cache.get(key, scope)
+            if value is not None:
+                # Callers may mutate the result, keep the cached copy pristine
+                return copy.deepcopy(value)
+            result = func(*args, **kwargs)
+            if should_cache(result):
+                cache.set(key, copy.deepcopy(result), vector, scope)
+            return result
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -221,6 +221,8 @@ class VectorStoreLoader:
             all_documents = []
             loaded_count = 0
             failed_pdfs = []
+            # Chunks, unlike pages, are only counted by the ingest itself
+            inserted_before = self.rag_manager.inserted_count
             
             for pdf_path in pdf_paths:
                 try:
@@ -251,28 +253,12 @@ class VectorStoreLoader:
                     logger.error(f"❌ Failed to load {pdf_path}: {e}")
                     failed_pdfs.append(pdf_path)
             
+            total_chunks = self.rag_manager.inserted_count - inserted_before
             if all_documents:
-                # Chunk all documents
-                logger.info("Chunking documents...")
-                chunked_docs = self.rag_manager.chunk_documents(all_documents)
-                
-                # Build vectorstore
-                logger.info("Building vectorstore...")
-                self.rag_manager.vectorstore = self.rag_manager.build_vectorstore(chunked_docs)
-                
-                # Setup retriever
-                self.rag_manager.retriever = self.rag_manager.vectorstore.as_retriever(
-                    search_type="mmr",
-                    search_kwargs={
-                        "k": 5,
-                        "fetch_k": 10,
-                        "lambda_mult": 0.7
-                    }
-                )
-                
-                logger.info(f"✅ Vectorstore created successfully!")
-                logger.info(f"📊 Total documents: {len(all_documents)}")
-                logger.info(f"📊 Total chunks: {len(chunked_docs)}")
+                # load_pdf_with_board has already chunked, embedded and
+                # inserted every page into Weaviate
+                logger.info(f"✅ Vectorstore updated successfully!")
+                logger.info(f"📊 Total chunks: {total_chunks}")
             
             result = {
                 "success": True,
@@ -280,7 +266,7 @@ class VectorStoreLoader:
                 "loaded_pdfs": loaded_count,
                 "failed_pdfs": failed_pdfs,
                 "total_documents": len(all_documents),
-                "total_chunks": len(chunked_docs) if all_documents else 0,
+                "total_chunks": total_chunks,
                 "vectorstore_path": self.vectorstore_path
             }
             
@@ -347,10 +333,7 @@ class VectorStoreLoader:
         try:
             logger.info("🔍 Verifying vectorstore...")
             
-            # Try to load existing vectorstore
-            vectorstore = self.rag_manager.load_vectorstore()
-            
-            if vectorstore is None:
+            if self.rag_manager.client is None:
                 return {"success": False, "error": "No vectorstore found"}
             
             # Test with sample queries
@@ -365,8 +348,8 @@ class VectorStoreLoader:
             
             for query in test_queries:
                 try:
-                    # Use the vectorstore directly for testing
-                    docs = vectorstore.similarity_search(query, k=3)
+                    # Query the Weaviate collection through the retriever
+                    docs = self.rag_manager.retrieve_context_by_board(query, top_k=3)
                     test_results[query] = {
                         "found_docs": len(docs),
                         "success": len(docs) > 0
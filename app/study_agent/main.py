@@ -129,7 +129,7 @@ class EducationalTutorSystem:
             if hasattr(self.agent, 'rag_manager') and self.agent.rag_manager:
                 validation_results["rag_system_available"] = True
                 
-                if self.agent.rag_manager.vectorstore:
+                if self.agent.rag_manager.client:
                     validation_results["vectorstore_loaded"] = True
             
         except Exception as e:
@@ -1,11 +1,11 @@
 """
-OCR utility for extracting text from images using Gemini Pro 1.5 Vision
+OCR utility for extracting text from images using Gemini vision
 """
-import google.generativeai as genai
 from PIL import Image
 import os
 from typing import Optional
 import logging
+from app.study_agent.gemini_utils import ensure_configured, generate_content, get_model
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,7 +13,7 @@ logger = logging.getLogger(__name__)
 
 def extract_text_from_image(image_path: str, api_key: Optional[str] = None) -> str:
     """
-    Extract text from an image using Gemini Pro 1.5 Vision capabilities
+    Extract text from an image using Gemini vision capabilities
     
     Args:
         image_path (str): Path to the image file
@@ -24,18 +24,13 @@ def extract_text_from_image(image_path: str, api_key: Optional[str] = None) -> s
     """
     try:
         # Configure API key
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
+        ensure_configured(api_key)
         
         # Load and process image
         image = Image.open(image_path)
         
-        # Initialize Gemini Pro 1.5 Vision model
-        model = genai.GenerativeModel("gemini-1.5-pro")
+        # Shared Gemini model (DEFAULT_MODEL) handles vision input
+        model = get_model()
         
         # Craft prompt for OCR extraction focused on math problems
         prompt = """
@@ -54,7 +49,7 @@ def extract_text_from_image(image_path: str, api_key: Optional[str] = None) -> s
         """
         
         # Generate response
-        response = model.generate_content([prompt, image])
+        response = generate_content(model, [prompt, image])
         
         if response.text:
             logger.info(f"Successfully extracted text from image: {image_path}")
@@ -13,6 +13,7 @@ from dataclasses import dataclass, asdict, replace
 import json
 from datetime import datetime
 from copy import deepcopy
+from app.study_agent.gemini_utils import DEFAULT_MODEL, generate_content
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -66,8 +67,8 @@ class PDF_ReaderUtils:
             genai.configure(api_key=google_api_key)
             
             # Use the correct model name for vision tasks
-            vision_model = genai.GenerativeModel("gemini-1.5-pro")
-            logger.info("✅ Gemini 1.5 Pro model initialized successfully")
+            vision_model = genai.GenerativeModel(DEFAULT_MODEL)
+            logger.info(f"✅ Gemini model {DEFAULT_MODEL} initialized successfully")
             return vision_model
         
         except Exception as e:
@@ -170,40 +171,7 @@ class PDF_ReaderUtils:
             pages_data = []
             for page_num in range(len(pdf_document)):
                 logger.info(f"🖼️ Converting page {page_num + 1}/{len(pdf_document)} to image...")
-                
-                page = pdf_document[page_num]
-                # Create transformation matrix for zoom
-                mat = fitz.Matrix(zoom_factor, zoom_factor)
-                # Render page to pixmap
-                pix = page.get_pixmap(matrix=mat)
-                # Convert to PIL Image
-                img_data = pix.tobytes("png")
-                img = Image.open(io.BytesIO(img_data))
-                
-                # Create image info
-                image_info = {
-                    "format": "PNG",
-                    "mode": img.mode,
-                    "size": img.size,
-                    "zoom_factor": zoom_factor
-                }
-                
-                # Create initial page metadata (content_length will be added later)
-                page_metadata = self.create_page_metadata(
-                    base_metadata, 
-                    page_num + 1, 
-                    img.size, 
-                    0,  # Will be updated after content extraction
-                    {"image_info": image_info}
-                )
-                
-                pages_data.append({
-                    "image": img,
-                    "metadata": page_metadata,
-                    "image_info": image_info
-                })
-                
-                logger.info(f"✅ Page {page_num + 1} converted (size: {img.size})")
+                pages_data.append(self.render_page(pdf_document, page_num, base_metadata, zoom_factor))
             
             pdf_document.close()
             logger.info(f"✅ Successfully converted {len(pages_data)} pages to images with metadata")
@@ -213,6 +181,53 @@ class PDF_ReaderUtils:
             logger.error(f"❌ Failed to convert PDF to images: {e}")
             raise
 
+    def render_page(self, pdf_document: fitz.Document, page_num: int, base_metadata: Dict[str, Any],
+                    zoom_factor: float = 2.0) -> Dict[str, Any]:
+        """
+        Render a single PDF page to a PIL Image with metadata
+        
+        Args:
+            pdf_document: Open PyMuPDF document
+            page_num: Page index (0-indexed)
+            base_metadata: Base metadata for the PDF
+            zoom_factor: Zoom factor for image quality
+        
+        Returns:
+            Dictionary containing image, metadata and image_info
+        """
+        page = pdf_document[page_num]
+        # Create transformation matrix for zoom
+        mat = fitz.Matrix(zoom_factor, zoom_factor)
+        # Render page to pixmap
+        pix = page.get_pixmap(matrix=mat)
+        # Convert to PIL Image
+        img_data = pix.tobytes("png")
+        img = Image.open(io.BytesIO(img_data))
+        
+        # Create image info
+        image_info = {
+            "format": "PNG",
+            "mode": img.mode,
+            "size": img.size,
+            "zoom_factor": zoom_factor
+        }
+        
+        # Create initial page metadata (content_length will be added later)
+        page_metadata = self.create_page_metadata(
+            base_metadata, 
+            page_num + 1, 
+            img.size, 
+            0,  # Will be updated after content extraction
+            {"image_info": image_info}
+        )
+        
+        logger.info(f"✅ Page {page_num + 1} converted (size: {img.size})")
+        return {
+            "image": img,
+            "metadata": page_metadata,
+            "image_info": image_info
+        }
+
     def process_image_with_gemini(self, vision_model: genai.GenerativeModel, 
                                 page_data: Dict[str, Any],
                                 prompt: str = None) -> PageContent:
@@ -249,7 +264,7 @@ class PDF_ReaderUtils:
             if image.mode != "RGB":
                 image = image.convert("RGB")
             
-            response = vision_model.generate_content([prompt, image])
+            response = generate_content(vision_model, [prompt, image])
             
             content = ""
             if response.text:
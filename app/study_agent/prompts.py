@@ -1,10 +1,19 @@
 """
 Prompt templates for the educational AI tutor system
 """
+import hashlib
+import string
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
 
 class PromptTemplates:
     """Collection of prompt templates for different functions"""
     
+    # Fixed instructions and the shared textbook context come before the
+    # per-request problem so consecutive calls share a long common prefix,
+    # which Gemini caches implicitly.
+    
     # OCR Extraction Prompts
     OCR_EXTRACTION = """
     You are an expert OCR system specialized in extracting text from math problems for Class 5 students.
@@ -22,15 +31,17 @@ class PromptTemplates:
     """
     
     # Intent Detection Prompts
-    INTENT_DETECTION = """
-    You are an AI tutor for Class 5 math students. Analyze the following content to determine the student's intent.
+    INTENT_AND_SPLIT = """
+    You are an AI tutor for Class 5 math students. Analyze the following content extracted from a math problem image.
     
     Extracted text from image: "{extracted_text}"
     Student prompt (if any): "{student_prompt}"
     
-    Determine if the student wants:
-    1. EVALUATION: Student has provided their solution and wants it checked/graded
-    2. SOLVE: Student wants the AI to solve the problem step-by-step
+    Do two things:
+    1. Determine the student's intent:
+       - "evaluation": the student has provided their solution and wants it checked/graded
+       - "solve": the student wants the AI to solve the problem step-by-step
+    2. Separate the content into the problem statement (the actual math question) and the student solution (any work, calculations, or answers provided by the student)
     
     Guidelines for classification:
     - If the extracted text contains a student's work, calculations, or answers, classify as "evaluation"
@@ -39,23 +50,7 @@ class PromptTemplates:
     - If student prompt contains phrases like "solve this", "help me solve", "how to do this", classify as "solve"
     - If unclear, default to "solve"
     
-    Return ONLY one word: either "evaluation" or "solve"
-    """
-    
-    PROBLEM_SOLUTION_EXTRACTION = """
-    You are analyzing text extracted from a Class 5 math problem image. 
-    
-    Extracted text: "{extracted_text}"
-    
-    Please separate the content into:
-    1. Problem statement (the actual math question)
-    2. Student solution (any work, calculations, or answers provided by the student)
-    
-    Return your response as a JSON object with this exact format:
-    {{
-        "problem_statement": "the math problem question",
-        "student_solution": "student's work and answer if present, or null if not present"
-    }}
+    Return your response as JSON following the provided response schema.
     
     If no student solution is visible, set student_solution to null.
     """
@@ -64,13 +59,7 @@ class PromptTemplates:
     SOLUTION_EVALUATION = """
     You are an expert Class 5 mathematics teacher evaluating a student's solution.
     
-    PROBLEM: {problem_statement}
-    
-    STUDENT'S SOLUTION: {student_solution}
-    
-    RELEVANT CONTEXT (from textbook): {context}
-    
-    Please evaluate the student's solution and provide:
+    Evaluate the student's solution given at the end and provide:
     
     1. CORRECTNESS: Is the final answer correct? (true/false)
     2. SCORE: Rate the solution from 0-10 based on:
@@ -85,18 +74,16 @@ class PromptTemplates:
        - Step-by-step correct solution
        - Learning points for improvement
     
-    Return your response as a JSON object with this exact format:
-    {{
-        "is_correct": boolean,
-        "score": integer (0-10),
-        "correct_answer": "correct final answer as string",
-        "explanation": "detailed explanation with correct solution steps",
-        "student_strengths": ["list", "of", "things", "done", "well"],
-        "areas_for_improvement": ["list", "of", "areas", "to", "improve"],
-        "method_used": "description of method student attempted to use"
-    }}
+    Also list the student's strengths, areas for improvement and the method the student attempted to use.
+    Return your response as JSON following the provided response schema.
     
     Be encouraging and constructive in your feedback, suitable for a Class 5 student.
+    
+    RELEVANT CONTEXT (from textbook): {context}
+    
+    PROBLEM: {problem_statement}
+    
+    STUDENT'S SOLUTION: {student_solution}
     """
     
     QUICK_ANSWER_CHECK = """
@@ -110,11 +97,7 @@ class PromptTemplates:
     
     # Problem Solving Prompts
     STEP_BY_STEP_SOLUTION = """
-    You are an expert Class 5 mathematics tutor. Solve this problem step-by-step in a way that's easy for a 10-year-old student to understand.
-    
-    PROBLEM: {problem_statement}
-    
-    RELEVANT CONTEXT (from textbook): {context}
+    You are an expert Class 5 mathematics tutor. Solve the problem given at the end step-by-step in a way that's easy for a 10-year-old student to understand.
     
     Please provide:
     
@@ -124,32 +107,15 @@ class PromptTemplates:
     4. KEY_CONCEPTS: List the mathematical concepts used
     5. TIPS: Helpful tips for solving similar problems
     
-    Return your response as a JSON object with this exact format:
-    {{
-        "final_answer": "the correct answer as a string",
-        "solution_steps": [
-            {{
-                "step_number": 1,
-                "description": "what to do in this step",
-                "calculation": "the actual calculation if any",
-                "result": "result of this step"
-            }},
-            {{
-                "step_number": 2,
-                "description": "what to do in this step",
-                "calculation": "the actual calculation if any", 
-                "result": "result of this step"
-            }}
-        ],
-        "explanation": "overall explanation of the solution approach",
-        "key_concepts": ["concept1", "concept2", "concept3"],
-        "tips": ["tip1", "tip2", "tip3"],
-        "difficulty_level": "easy/medium/hard for Class 5",
-        "time_needed": "estimated time in minutes"
-    }}
+    Also give the difficulty level for Class 5 (easy/medium/hard) and the estimated time needed in minutes.
+    Return your response as JSON following the provided response schema.
     
     Make sure your language is simple, encouraging, and appropriate for Class 5 students.
     Use clear mathematical notation and explain any symbols used.
+    
+    RELEVANT CONTEXT (from textbook): {context}
+    
+    PROBLEM: {problem_statement}
     """
     
     MULTIPLE_METHODS_SOLUTION = """
@@ -209,26 +175,22 @@ class PromptTemplates:
     SIMILAR_QUESTIONS_GENERATION = """
     You are a Class 5 mathematics teacher creating practice questions.
     
-    ORIGINAL PROBLEM: {problem_statement}
-    
-    RELEVANT CONTEXT: {context}
-    
-    Generate {num_questions} similar practice questions that:
+    Generate {num_questions} practice questions similar to the original problem given at the end that:
     1. Use the same mathematical concepts and operations
     2. Have similar difficulty level appropriate for Class 5
     3. Use different numbers/scenarios but same underlying structure
     4. Are engaging and relatable for 10-year-old students
     5. Can be solved using the same methods
     
-    Return your response as a JSON dictionary of questions:
-    {{
-        1: "Question 1 text here",
-        2: "Question 2 text here", 
-        3: "Question 3 text here"
-    }}
+    Return your response as a JSON array of {num_questions} question strings:
+    ["Question 1 text here", "Question 2 text here", "Question 3 text here"]
     
     Make sure each question is complete and clearly stated.
     Use simple language and relatable scenarios (toys, fruits, school items, etc.).
+    
+    RELEVANT CONTEXT: {context}
+    
+    ORIGINAL PROBLEM: {problem_statement}
     """
     
     CONTEXT_AWARE_QUESTIONS = """
@@ -296,25 +258,116 @@ class PromptTemplates:
     ["themed question 1", "themed question 2", "themed question 3"]
     """
 
+# Question counts and themes the generators actually request. Templates for
+# these values are specialised once at import so the instruction text is a
+# constant string and only the problem/context vary between calls.
+SPECIALIZED_QUESTION_COUNTS = (1, 2, 3, 5, 10)
+QUESTION_THEMES = ("animals", "sports", "food", "toys", "school", "nature", "vehicles", "family",
+                   "space", "cooking", "pirates", "superheroes")
+
+def _specialize(template: str, **values) -> str:
+    """Substitute the given placeholders, leaving the rest for str.format"""
+    for name, value in values.items():
+        template = template.replace("{" + name + "}", str(value))
+    return template
+
+_SPECIALIZED = {}
+for _theme in QUESTION_THEMES:
+    _SPECIALIZED[("themed", _theme)] = _specialize(PromptTemplates.THEMED_QUESTIONS, theme=_theme)
+for _n in SPECIALIZED_QUESTION_COUNTS:
+    _SPECIALIZED[("similar", _n)] = _specialize(PromptTemplates.SIMILAR_QUESTIONS_GENERATION, num_questions=_n)
+    _SPECIALIZED[("progressive", _n)] = _specialize(PromptTemplates.PROGRESSIVE_QUESTIONS, num_questions=_n)
+    for _theme in QUESTION_THEMES:
+        _SPECIALIZED[("themed", _n, _theme)] = _specialize(PromptTemplates.THEMED_QUESTIONS, num_questions=_n, theme=_theme)
+
+def _required_fields(template: str) -> frozenset:
+    """Names of the placeholders a template needs (escaped braces are ignored)"""
+    return frozenset(name for _, name, _, _ in string.Formatter().parse(template) if name)
+
+# Required placeholders per template, parsed once so formatting never has to
+# discover missing parameters by catching KeyError.
+_REQUIRED = {
+    template: _required_fields(template)
+    for template in [
+        value for name, value in vars(PromptTemplates).items()
+        if not name.startswith("_") and isinstance(value, str)
+    ] + list(_SPECIALIZED.values())
+}
+
+# Shared default fillers so default-path prompts reference the same objects
+_NO_CONTEXT = sys.intern("No additional context available")
+_NO_STUDENT_PROMPT = sys.intern("None provided")
+
+# Longer contexts (full RAG passages) are rarely repeated verbatim and would
+# stay pinned by the format_prompt cache, so only short ones are interned
+MAX_INTERNED_CONTEXT = 256
+
+def _intern_context(context: str) -> str:
+    """
+    Deduplicate short retrieved context strings across prompts
+    
+    The same short context is often interpolated into many prompts; interning
+    keeps one copy alive and makes cache-key comparisons identity checks.
+    """
+    if not context:
+        return _NO_CONTEXT
+    return sys.intern(context) if len(context) <= MAX_INTERNED_CONTEXT else context
+
+def _format_prompt(template: str, kwargs: dict) -> "FormattedPrompt":
+    """Check required placeholders and format a template"""
+    required = _REQUIRED.get(template)
+    if required is None:
+        required = _REQUIRED[template] = _required_fields(template)
+    missing = required - kwargs.keys()
+    if missing:
+        raise ValueError(f"Missing required parameter(s) for prompt: {', '.join(sorted(missing))}")
+    return FormattedPrompt.from_text(template.format_map(kwargs))
+
+@lru_cache(maxsize=256)
+def _format_prompt_cached(template: str, **kwargs) -> "FormattedPrompt":
+    """Cached _format_prompt for hashable variables"""
+    return _format_prompt(template, kwargs)
+
+@dataclass(frozen=True, slots=True)
+class FormattedPrompt:
+    """Immutable formatted prompt; hashable so repeated requests can share one instance"""
+    text: str
+    cache_key: str
+    byte_len: int
+    
+    @classmethod
+    def from_text(cls, text: str) -> "FormattedPrompt":
+        """Build a prompt, precomputing its content hash and encoded size"""
+        encoded = text.encode("utf-8")
+        return cls(text=text, cache_key=hashlib.sha256(encoded).hexdigest(), byte_len=len(encoded))
+    
+    def __str__(self) -> str:
+        return self.text
+
 class PromptFormatter:
     """Utility class for formatting prompts with variables"""
     
     @staticmethod
-    def format_prompt(template: str, **kwargs) -> str:
+    def format_prompt(template: str, **kwargs) -> FormattedPrompt:
         """
         Format a prompt template with provided variables
         
+        Repeated calls with the same template and hashable variables return
+        the same FormattedPrompt instance.
+        
         Args:
             template (str): The prompt template
             **kwargs: Variables to substitute in the template
         
         Returns:
-            str: Formatted prompt
+            FormattedPrompt: Formatted prompt
         """
         try:
-            return template.format(**kwargs)
-        except KeyError as e:
-            raise ValueError(f"Missing required parameter for prompt: {e}")
+            return _format_prompt_cached(template, **kwargs)
+        except TypeError:
+            # Unhashable variables (e.g. a list or dict context) can't key the
+            # cache; format them uncached as before
+            return _format_prompt(template, kwargs)
     
     @staticmethod
     def get_ocr_prompt() -> str:
@@ -322,40 +375,102 @@ class PromptFormatter:
         return PromptTemplates.OCR_EXTRACTION
     
     @staticmethod
-    def get_intent_detection_prompt(extracted_text: str, student_prompt: str = "") -> str:
-        """Get formatted intent detection prompt"""
+    def get_intent_and_split_prompt(extracted_text: str, student_prompt: str = "") -> FormattedPrompt:
+        """Get formatted combined intent detection and problem/solution split prompt"""
         return PromptFormatter.format_prompt(
-            PromptTemplates.INTENT_DETECTION,
+            PromptTemplates.INTENT_AND_SPLIT,
             extracted_text=extracted_text,
-            student_prompt=student_prompt or "None provided"
+            student_prompt=student_prompt or _NO_STUDENT_PROMPT
         )
     
     @staticmethod
-    def get_evaluation_prompt(problem_statement: str, student_solution: str, context: str = "") -> str:
+    def get_evaluation_prompt(problem_statement: str, student_solution: str, context: str = "") -> FormattedPrompt:
         """Get formatted evaluation prompt"""
         return PromptFormatter.format_prompt(
             PromptTemplates.SOLUTION_EVALUATION,
             problem_statement=problem_statement,
             student_solution=student_solution,
-            context=context or "No additional context available"
+            context=_intern_context(context)
         )
     
     @staticmethod
-    def get_solution_prompt(problem_statement: str, context: str = "") -> str:
+    def get_solution_prompt(problem_statement: str, context: str = "") -> FormattedPrompt:
         """Get formatted solution prompt"""
         return PromptFormatter.format_prompt(
             PromptTemplates.STEP_BY_STEP_SOLUTION,
             problem_statement=problem_statement,
-            context=context or "No additional context available"
+            context=_intern_context(context)
+        )
+    
+    @staticmethod
+    def get_multiple_methods_prompt(problem_statement: str, context: str = "") -> FormattedPrompt:
+        """Get formatted multiple solution methods prompt"""
+        return PromptFormatter.format_prompt(
+            PromptTemplates.MULTIPLE_METHODS_SOLUTION,
+            problem_statement=problem_statement,
+            context=_intern_context(context)
+        )
+    
+    @staticmethod
+    def get_problem_type_prompt(problem_statement: str) -> FormattedPrompt:
+        """Get formatted problem type analysis prompt"""
+        return PromptFormatter.format_prompt(
+            PromptTemplates.PROBLEM_TYPE_ANALYSIS,
+            problem_statement=problem_statement
         )
     
     @staticmethod
-    def get_similar_questions_prompt(problem_statement: str, context: str = "", num_questions: int = 3) -> str:
+    def get_learning_objectives_prompt(problem_statement: str) -> FormattedPrompt:
+        """Get formatted learning objectives prompt"""
+        return PromptFormatter.format_prompt(
+            PromptTemplates.LEARNING_OBJECTIVES,
+            problem_statement=problem_statement
+        )
+    
+    @staticmethod
+    def get_similar_questions_prompt(problem_statement: str, context: str = "", num_questions: int = 3) -> FormattedPrompt:
         """Get formatted similar questions prompt"""
+        template = _SPECIALIZED.get(("similar", num_questions), PromptTemplates.SIMILAR_QUESTIONS_GENERATION)
+        return PromptFormatter.format_prompt(
+            template,
+            problem_statement=problem_statement,
+            context=_intern_context(context),
+            num_questions=num_questions
+        )
+    
+    @staticmethod
+    def get_context_aware_questions_prompt(problem_statement: str, context: str, num_questions: int = 3) -> FormattedPrompt:
+        """Get formatted textbook context-aware questions prompt"""
+        return PromptFormatter.format_prompt(
+            PromptTemplates.CONTEXT_AWARE_QUESTIONS,
+            problem_statement=problem_statement,
+            context=_intern_context(context),
+            num_questions=num_questions
+        )
+    
+    @staticmethod
+    def get_progressive_questions_prompt(problem_statement: str, num_questions: int = 3) -> FormattedPrompt:
+        """Get formatted progressive difficulty questions prompt"""
+        template = _SPECIALIZED.get(("progressive", num_questions), PromptTemplates.PROGRESSIVE_QUESTIONS)
+        return PromptFormatter.format_prompt(
+            template,
+            problem_statement=problem_statement,
+            num_questions=num_questions
+        )
+    
+    @staticmethod
+    def get_themed_questions_prompt(problem_statement: str, theme: str, num_questions: int = 3) -> FormattedPrompt:
+        """Get formatted themed questions prompt"""
+        theme = theme.strip().lower()
+        template = (
+            _SPECIALIZED.get(("themed", num_questions, theme))
+            or _SPECIALIZED.get(("themed", theme))
+            or PromptTemplates.THEMED_QUESTIONS
+        )
         return PromptFormatter.format_prompt(
-            PromptTemplates.SIMILAR_QUESTIONS_GENERATION,
+            template,
             problem_statement=problem_statement,
-            context=context or "No additional context available",
+            theme=theme,
             num_questions=num_questions
         )
 
@@ -2,13 +2,28 @@
 RAG (Retrieval-Augmented Generation) utilities for the educational tutor system
 """
 import os
+import ast
+import asyncio
+import hashlib
 import logging
-import pdb
+import multiprocessing
+import re
 import json
+import threading
+import fitz  # PyMuPDF
+import numpy as np
 import weaviate
-from typing import List, Dict, Any, Optional
-from weaviate.classes.init import Auth
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from weaviate.classes.init import Auth, AdditionalConfig, Timeout
+from weaviate.config import ConnectionConfig
 import weaviate.classes.config as weaviate_config
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter, MetadataQuery
+from cachetools import LRUCache, TTLCache
 
 # Updated imports for Windows compatibility
 try:
@@ -17,43 +32,321 @@ except ImportError:
     from langchain.document_loaders import PyPDFLoader
 
 try:
-    from langchain_community.vectorstores import FAISS
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
 except ImportError:
-    from langchain.vectorstores import FAISS
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 try:
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from diskcache import Cache as EmbeddingCache
 except ImportError:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    EmbeddingCache = None
 
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain.schema import Document
 from app.study_agent.pdf_reader_utils import PDF_ReaderUtils, PageContent
 from app.study_agent.chunk_strategy import DocumentChunker
+from app.study_agent.async_utils import run_coroutine
 
 logger = logging.getLogger(__name__)
 
+# State boards and the region each maps to, matched in one regex scan
+_STATE_BOARD_REGIONS = {
+    "maharashtra": "Maharashtra",
+    "karnataka": "Karnataka",
+    "tamil nadu": "Tamil Nadu",
+    "kerala": "Kerala",
+    "gujarat": "Gujarat",
+    "rajasthan": "Rajasthan",
+    "west bengal": "West Bengal",
+    "uttar pradesh": "Uttar Pradesh",
+    "delhi": "Delhi"
+}
+_STATE_BOARD_RE = re.compile("|".join(map(re.escape, _STATE_BOARD_REGIONS)))
+_NATIONAL_BOARD_RE = re.compile(r"cbse|ncert|icse")
+# Checked in order, first match wins
+_CURRICULUM_TYPES = (
+    (_NATIONAL_BOARD_RE, "National"),
+    (re.compile("state"), "State"),
+    (re.compile(r"international|ib"), "International")
+)
+
+# Start method for worker pools. By the time a pool starts, this process runs
+# insert threads and the gRPC Weaviate client, whose locks and channels must
+# not be copied by fork; forkserver/spawn start workers from a clean process.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Lower-cased copies of filterable metadata, stored with field tokenization
+# so retrieval filters are exact indexed matches without per-query lower()
+LOWERCASE_PROPERTIES = {
+    "board_lc": "board",
+    "class_lc": "class",
+    "subject_lc": "subject",
+    "chapter_lc": "chapter",
+    "region_lc": "region"
+}
+# Stored property holding each metadata field, where the names differ
+_STORED_PROPERTY_NAMES = {"class": "class_name"}
+
+# Layout of one retrieved document in the context string
+_CONTEXT_TEMPLATE = (
+    "\nContext {index}:\n"
+    "Board: {board}\n"
+    "Subject: {subject}\n"
+    "Class: {class}\n"
+    "Chapter: {chapter}\n"
+    "Curriculum Type: {curriculum_type}\n"
+    "Region: {region}\n"
+    "Content: {content}\n"
+)
+
+class _ContextFields(dict):
+    """Template fields that render missing metadata as 'Unknown'"""
+    def __missing__(self, key: str) -> str:
+        return "Unknown"
+
+def _parse_topics(value: Optional[str]) -> List[str]:
+    """Decode the stored topics property back into a list"""
+    if not value:
+        return []
+    try:
+        return json.loads(value)
+    except ValueError:
+        # Objects inserted before topics were JSON-encoded hold a Python repr
+        try:
+            return list(ast.literal_eval(value))
+        except (ValueError, SyntaxError):
+            return [value]
+
+@dataclass
+class ChunkRecord:
+    """A chunk of a page; chunks of the same page share one metadata dict"""
+    __slots__ = ("content", "metadata")
+    content: str
+    metadata: Dict[str, Any]
+
+def _lowercase_property_configs() -> List[weaviate_config.Property]:
+    """Property definitions for the lower-cased filter fields"""
+    return [
+        weaviate_config.Property(
+            name=name,
+            data_type=weaviate_config.DataType.TEXT,
+            description=f"Lower-cased {source} for filtering",
+            tokenization=weaviate_config.Tokenization.FIELD,
+            skip_vectorization=True
+        )
+        for name, source in LOWERCASE_PROPERTIES.items()
+    ]
+
+def _parse_pdf(api_key: str, config: Dict[str, Any]) -> Optional[List[PageContent]]:
+    """Parse one PDF config into page contents; runs in a worker process"""
+    return PDF_ReaderUtils().get_pdf_processing_info(
+        api_key=api_key,
+        pdf_path=config["pdf_path"],
+        subject=config["subject"],
+        class_name=config["class_name"],
+        chapter=config["chapter"],
+        board=config["board"],
+        topics=config.get("topics", []),
+        filename=os.path.basename(config["pdf_path"])
+    )
+
+@lru_cache(maxsize=4)
+def _vision_model(api_key: str):
+    """Vision model for the current worker process, set up once per API key"""
+    return PDF_ReaderUtils().setup_gemini(api_key=api_key)
+
+def _parse_page(args: Tuple[str, str, int, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Render and extract a single PDF page; runs in a worker process
+    
+    Args:
+        args: (api_key, pdf_path, page index, base PDF metadata)
+    
+    Returns:
+        Dict[str, Any]: PageContent fields as a picklable dict
+    """
+    api_key, pdf_path, page_num, base_metadata = args
+    pdf_reader_utils = PDF_ReaderUtils()
+    with fitz.open(pdf_path) as pdf_document:
+        page_data = pdf_reader_utils.render_page(pdf_document, page_num, base_metadata)
+    page_content = pdf_reader_utils.process_image_with_gemini(_vision_model(api_key), page_data)
+    return page_content.to_dict()
+
+def _split_content(chunker: DocumentChunker, splitter: RecursiveCharacterTextSplitter, content: str) -> List[str]:
+    """Chunk one page with the advanced strategy, falling back to plain recursive splitting"""
+    try:
+        chunks = chunker.chunk_educational_content(
+            content=content,
+            strategy="advanced",
+            max_chunk_size=RAGManager.CHUNK_SIZE,
+            overlap_size=RAGManager.CHUNK_OVERLAP
+        )
+        
+        logger.info(f"Advanced chunking created {len(chunks)} sections with size limit {RAGManager.CHUNK_SIZE}")
+        return chunks
+        
+    except Exception as e:
+        logger.error(f"Error in advanced chunking: {e}")
+        # Fallback to RecursiveCharacterTextSplitter
+        return splitter.split_text(content)
+
+@lru_cache(maxsize=1)
+def _worker_chunking_tools() -> Tuple[DocumentChunker, RecursiveCharacterTextSplitter]:
+    """Chunker and fallback splitter for the current worker process"""
+    return DocumentChunker(), RecursiveCharacterTextSplitter(
+        chunk_size=RAGManager.CHUNK_SIZE,
+        chunk_overlap=RAGManager.CHUNK_OVERLAP,
+        length_function=len
+    )
+
+def _simhash(text: str) -> int:
+    """64-bit SimHash of a text over its word-trigram shingles"""
+    words = text.lower().split()
+    weights = [0] * 64
+    for i in range(max(1, len(words) - 2)):
+        shingle = " ".join(words[i:i + 3]).encode("utf-8")
+        value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+class _SimHashIndex:
+    """
+    Near-duplicate lookup over 64-bit SimHashes
+    
+    Fingerprints are bucketed by each of their four 16-bit bands. Two
+    fingerprints at most max_distance (< 4) bits apart must agree on at least
+    one band, so only fingerprints sharing a band are compared instead of
+    every fingerprint seen so far.
+    """
+    
+    BANDS = 4
+    BAND_BITS = 16
+    
+    def __init__(self, max_distance: int):
+        if max_distance >= self.BANDS:
+            raise ValueError(f"max_distance must be below {self.BANDS} for banded lookup")
+        self.max_distance = max_distance
+        self._buckets = [{} for _ in range(self.BANDS)]
+    
+    def _bands(self, fingerprint: int) -> List[int]:
+        """The fingerprint's 16-bit bands, lowest first"""
+        mask = (1 << self.BAND_BITS) - 1
+        return [fingerprint >> (band * self.BAND_BITS) & mask for band in range(self.BANDS)]
+    
+    def add_if_new(self, fingerprint: int) -> bool:
+        """
+        Add a fingerprint unless it is a near-duplicate of one already added
+        
+        Args:
+            fingerprint (int): 64-bit SimHash
+        
+        Returns:
+            bool: False if a fingerprint within max_distance bits was already added
+        """
+        bands = self._bands(fingerprint)
+        for buckets, key in zip(self._buckets, bands):
+            for seen in buckets.get(key, ()):
+                if bin(fingerprint ^ seen).count("1") <= self.max_distance:
+                    return False
+        for buckets, key in zip(self._buckets, bands):
+            buckets.setdefault(key, []).append(fingerprint)
+        return True
+
+def _chunk_worker(content: str) -> List[Tuple[str, int]]:
+    """
+    Chunk one page and fingerprint each chunk; runs in a worker process
+    
+    Chunks shorter than RAGManager.MIN_CHUNK_LENGTH (headers, page
+    numbers, bare titles) are dropped here.
+    
+    Args:
+        content (str): Page content
+    
+    Returns:
+        List[Tuple[str, int]]: (chunk, SimHash) pairs
+    """
+    chunks = _split_content(*_worker_chunking_tools(), content)
+    return [(chunk, _simhash(chunk)) for chunk in chunks if len(chunk.strip()) >= RAGManager.MIN_CHUNK_LENGTH]
+
+class _WeaviateRetriever:
+    """Retriever over the Weaviate collection, in place of a local vector store"""
+    
+    def __init__(self, rag_manager: "RAGManager", top_k: int = 5):
+        self.rag_manager = rag_manager
+        self.top_k = top_k
+    
+    def get_relevant_documents(self, query: str) -> List[Document]:
+        """Return the documents nearest to the query embedding"""
+        return self.rag_manager.retrieve_context_by_board(query, top_k=self.top_k)
+
 class RAGManager:
     """Manages the RAG system for educational content retrieval"""
     
+    CHUNK_SIZE = 1000  # Maximum size for each chunk
+    CHUNK_OVERLAP = 100  # Overlap size for chunks
+    HYBRID_ALPHA = 0.7  # Vector vs keyword weight for context retrieval
+    EMBED_MAX_ATTEMPTS = 3  # Tries per embeddings batch before giving up
+    EMBED_RETRY_DELAY = 1.0  # Seconds before the first retry, doubled each time
+    INSERT_MAX_ATTEMPTS = 2  # Passes over objects rejected by Weaviate
+    MIN_CHUNK_LENGTH = 50  # Shorter chunks are not worth embedding
+    SIMHASH_MAX_DISTANCE = 3  # Chunks within this many differing bits are near-duplicates
+    
     def __init__(self, api_key: str,
-                 weaviate_url: str, weaviate_api_key: str, vectorstore_path: str = "vectorstore"):
+                 weaviate_url: str, weaviate_api_key: str, vectorstore_path: str = "vectorstore",
+                 embed_batch_size: int = 100, insert_batch_size: int = 200,
+                 insert_concurrent_requests: int = 4, embed_concurrency: int = 8,
+                 embedding_cache_dir: Optional[str] = "embed_cache"):
         """
         Initialize RAG Manager
         
         Args:
             api_key (str): Google API key
             vectorstore_path (str): Path to store the vector database
+            embed_batch_size (int): Number of chunks sent per embeddings API call
+            insert_batch_size (int): Number of objects per Weaviate batch request
+            insert_concurrent_requests (int): Weaviate batch requests in flight at once
+            embed_concurrency (int): Embeddings API calls in flight at once
+            embedding_cache_dir (str, optional): Directory of the on-disk chunk embedding cache
         """
         self.api_key = api_key
+        self.embed_batch_size = embed_batch_size
+        self.insert_batch_size = insert_batch_size
+        self.insert_concurrent_requests = insert_concurrent_requests
+        self.embed_concurrency = embed_concurrency
+        # Chunk embeddings keyed by content hash, so re-ingesting overlapping
+        # PDFs does not call the embeddings API again
+        if EmbeddingCache is not None and embedding_cache_dir:
+            self.embedding_cache = EmbeddingCache(embedding_cache_dir)
+        else:
+            self.embedding_cache = {}
+        # Query embeddings and retrieval results for repeated questions; the
+        # epoch is bumped on ingestion so stale results are never served
+        self._query_vector_cache = LRUCache(maxsize=1024)
+        self._result_cache = TTLCache(maxsize=512, ttl=300)
+        # cachetools caches are not thread-safe and requests run on a thread pool
+        self._cache_lock = threading.Lock()
+        self._cache_epoch = 0
+        # Chunks inserted into Weaviate by this manager, across all ingests
+        self.inserted_count = 0
         self.vectorstore_path = vectorstore_path
-        self.vectorstore = None
         self.embeddings = None
-        self.retriever = None
+        # Weaviate is the only vector store; the retriever queries it directly
+        self.retriever = _WeaviateRetriever(self)
         self.client = None
+        # Collection handles resolved once per process, keyed by name
+        self._collections = {}
         self.weaviate_url = weaviate_url
         self.weaviate_api_key = weaviate_api_key
         self.chunker = DocumentChunker()
+        # Fallback splitter, built once and reused for every page
+        self._splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.CHUNK_SIZE,
+            chunk_overlap=self.CHUNK_OVERLAP,
+            length_function=len
+        )
         
         # Initialize embeddings
         self._initialize_embeddings()
@@ -74,11 +367,26 @@ class RAGManager:
     def _initialize_weaviate_client(self):
         """Initialize Weaviate client"""
         try:
+            # Handles are bound to the previous connection
+            self._collections.clear()
             self.client = weaviate.connect_to_weaviate_cloud(
                 cluster_url=self.weaviate_url,
-                auth_credentials=Auth.api_key(self.weaviate_api_key)
+                auth_credentials=Auth.api_key(self.weaviate_api_key),
+                # Keep enough pooled connections warm for concurrent insert
+                # batches, and give large inserts room before timing out
+                additional_config=AdditionalConfig(
+                    timeout=Timeout(init=30, query=60, insert=120),
+                    connection=ConnectionConfig(
+                        session_pool_connections=20,
+                        session_pool_maxsize=100,
+                        session_pool_max_retries=3
+                    )
+                )
             )
             logger.info("Weaviate client initialized successfully")
+            # Resolve the default collection up front so the first ingest
+            # does not pay the schema round-trip
+            self.create_weaviate_schema("EducationalDocument")
         except Exception as e:
             logger.error(f"Failed to initialize Weaviate client: {e}")
             raise
@@ -103,45 +411,23 @@ class RAGManager:
             
             logger.info(f"Loading PDF: {pdf_path} for {board} board")
             
-            # Load PDF
-            pdf_reader_utils = PDF_ReaderUtils()
-            documents = pdf_reader_utils.get_pdf_processing_info(
-                api_key=self.api_key,
-                pdf_path=pdf_path,
-                subject=subject,
-                class_name=class_name,
-                chapter=chapter,
-                board=board,
-                topics=topics,
+            # Load PDF, rendering and extracting pages in parallel worker processes
+            base_metadata = PDF_ReaderUtils().create_pdf_metadata(
+                pdf_path, subject, class_name, chapter, board, topics,
                 filename=os.path.basename(pdf_path)
             )
+            with fitz.open(pdf_path) as pdf_document:
+                page_count = len(pdf_document)
+            page_args = [(self.api_key, pdf_path, page_num, base_metadata) for page_num in range(page_count)]
+            with ProcessPoolExecutor(max_workers=max(1, min(page_count, os.cpu_count() or 1)), mp_context=_MP_CONTEXT) as executor:
+                documents = [PageContent(**page) for page in executor.map(_parse_page, page_args)]
             # convert json object from `training_data/data/eemm102_page1_2.json` and convert it to List[PageContent]
             # with open("training_data/data/eemm102_page1_2.json", "r") as f:
             #     json_data = json.load(f)
             #     documents = [PageContent(**page) for page in json_data]
 
-            # pdb.set_trace()  # Debugging line to inspect documents
-            # print(documents)
-            # for doc in documents:
-            #     doc.print_json()
-
-            chunked_docs = []
-
-            for doc in documents:
-
-                # Add metadata to each document
-                doc.metadata["region"] = self._get_board_region(board)
-                doc.metadata["curriculum_type"] = self._get_curriculum_type(board)
-                # chunk the document content
-                logger.info("Chunking documents for vector store...")
-                chunked_document_contents = self.chunk_documents(doc.content)
-                logger.info(f"Created {len(chunked_document_contents)} chunks")
-                for chunked_document_content in chunked_document_contents:
-                    chunked_doc = doc.copy()
-                    chunked_doc.content = chunked_document_content
-                    chunked_docs.append(chunked_doc)
-
-            self.add_documents_to_weaviate(chunked_docs)
+            # Chunks are produced lazily and consumed batch by batch
+            self.add_documents_to_weaviate(self._iter_chunked(documents, board))
             logger.info(f"Loaded {len(documents)} documents from PDF")
 
             logger.info(f"Vector store setup completed for {board} {subject}")
@@ -151,7 +437,94 @@ class RAGManager:
             logger.error(f"Error loading PDF with board info: {e}")
             raise
     
-    def _get_curriculum_type(self, board: str) -> str:
+    def load_multiple_boards(self, board_configs: List[Dict[str, Any]], max_workers: Optional[int] = None) -> Dict[str, List[PageContent]]:
+        """
+        Load several PDFs, parsing them in parallel worker processes
+        
+        PDF rendering and page extraction run in a process pool. Each PDF is
+        chunked, embedded and inserted as soon as it is parsed, while the
+        remaining PDFs are still being processed.
+        
+        Args:
+            board_configs (List[Dict[str, Any]]): One dict per PDF with pdf_path, subject,
+                class_name, chapter, board and optional topics
+            max_workers (int, optional): Number of worker processes (default: one per PDF, up to CPU count)
+        
+        Returns:
+            Dict[str, List[PageContent]]: Page documents per successfully loaded pdf_path
+        """
+        if not board_configs:
+            return {}
+        
+        for config in board_configs:
+            if not os.path.exists(config["pdf_path"]):
+                raise FileNotFoundError(f"PDF file not found: {config['pdf_path']}")
+        
+        workers = max_workers or min(len(board_configs), os.cpu_count() or 1)
+        logger.info(f"Loading {len(board_configs)} PDFs with {workers} worker processes")
+        
+        loaded = {}
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT) as executor:
+            futures = {executor.submit(_parse_pdf, self.api_key, config): config for config in board_configs}
+
+            def iter_chunks() -> Iterator[ChunkRecord]:
+                # Hand PDFs to the ingest pipeline in the order they finish parsing
+                for future in as_completed(futures):
+                    config = futures[future]
+                    try:
+                        documents = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to load {config['pdf_path']}: {e}")
+                        continue
+                    if not documents:
+                        logger.error(f"No pages extracted from {config['pdf_path']}")
+                        continue
+                    loaded[config["pdf_path"]] = documents
+                    yield from self._iter_chunked(documents, config["board"])
+
+            self.add_documents_to_weaviate(iter_chunks())
+        logger.info(f"Loaded {len(loaded)}/{len(board_configs)} PDFs into the vector store")
+        return loaded
+    
+    def _iter_chunked(self, documents: Iterable[PageContent], board: str) -> Iterator[ChunkRecord]:
+        """
+        Add board metadata to pages and lazily split them into chunks
+        
+        Short chunks and near-duplicates of an earlier chunk of the same PDF
+        (repeated headers, boilerplate) are skipped before embedding.
+        
+        Args:
+            documents (Iterable[PageContent]): Extracted pages of one PDF
+            board (str): Educational board of the PDF
+        
+        Yields:
+            ChunkRecord: One record per chunk
+        """
+        # Board-derived metadata is the same for every page
+        region = self._get_board_region(board)
+        curriculum_type = self._get_curriculum_type(board)
+
+        # Split pages in parallel worker processes; results come back in page order
+        documents = list(documents)
+        seen_fingerprints = _SimHashIndex(self.SIMHASH_MAX_DISTANCE)
+        duplicates = 0
+        with ProcessPoolExecutor(max_workers=max(1, min(len(documents), os.cpu_count() or 1)), mp_context=_MP_CONTEXT) as executor:
+            page_chunks = executor.map(_chunk_worker, [doc.content for doc in documents])
+            # Chunks of a page share its metadata since it is only read from here on
+            for doc, chunks in zip(documents, page_chunks):
+                doc.metadata["region"] = region
+                doc.metadata["curriculum_type"] = curriculum_type
+                for chunk, fingerprint in chunks:
+                    if not seen_fingerprints.add_if_new(fingerprint):
+                        duplicates += 1
+                        continue
+                    yield ChunkRecord(content=chunk, metadata=doc.metadata)
+        if duplicates:
+            logger.info(f"Skipped {duplicates} near-duplicate chunks")
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _get_curriculum_type(board: str) -> str:
         """
         Get curriculum type based on board
         
@@ -163,20 +536,14 @@ class RAGManager:
         """
         board_lower = board.lower()
         
-        if "cbse" in board_lower:
-            return "National"
-        elif "ncert" in board_lower:
-            return "National"
-        elif "icse" in board_lower:
-            return "National"
-        elif "state" in board_lower:
-            return "State"
-        elif "international" in board_lower or "ib" in board_lower:
-            return "International"
-        else:
-            return "Other"
+        for pattern, curriculum_type in _CURRICULUM_TYPES:
+            if pattern.search(board_lower):
+                return curriculum_type
+        return "Other"
     
-    def _get_board_region(self, board: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _get_board_region(board: str) -> str:
         """
         Get board region
         
@@ -189,24 +556,12 @@ class RAGManager:
         board_lower = board.lower()
         
         # State boards
-        state_boards = {
-            "maharashtra": "Maharashtra",
-            "karnataka": "Karnataka", 
-            "tamil nadu": "Tamil Nadu",
-            "kerala": "Kerala",
-            "gujarat": "Gujarat",
-            "rajasthan": "Rajasthan",
-            "west bengal": "West Bengal",
-            "uttar pradesh": "Uttar Pradesh",
-            "delhi": "Delhi"
-        }
-        
-        for state, region in state_boards.items():
-            if state in board_lower:
-                return region
+        match = _STATE_BOARD_RE.search(board_lower)
+        if match:
+            return _STATE_BOARD_REGIONS[match.group(0)]
         
         # National boards
-        if any(term in board_lower for term in ["cbse", "ncert", "icse"]):
+        if _NATIONAL_BOARD_RE.search(board_lower):
             return "National"
         
         return "Unknown"
@@ -215,30 +570,7 @@ class RAGManager:
         """
         Advanced chunking with size limits while preserving educational structure
         """
-        max_size = 1000  # Maximum size for each chunk
-        overlap_size = 100  # Overlap size for chunks
-        try:
-            chunks = self.chunker.chunk_educational_content(
-                content=document_content,
-                strategy="advanced",
-                max_chunk_size=max_size,
-                overlap_size=overlap_size
-            )
-            
-            logger.info(f"Advanced chunking created {len(chunks)} sections with size limit {max_size}")
-            pdb.set_trace()  # Debugging line to inspect chunks
-            print(chunks)
-            return chunks
-            
-        except Exception as e:
-            logger.error(f"Error in advanced chunking: {e}")
-            # Fallback to RecursiveCharacterTextSplitter
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=max_size,
-                chunk_overlap=100,
-                length_function=len
-            )
-            return text_splitter.split_text(document_content)
+        return _split_content(self.chunker, self._splitter, document_content)
         
     def retrieve_context_by_board(self, query: str, board_filter: Optional[str] = None, 
                                  class_filter: Optional[str] = None, subject_filter: Optional[str] = None, 
@@ -257,41 +589,32 @@ class RAGManager:
             List[Document]: Retrieved documents filtered by board, class, and subject
         """
         try:
-            if not self.retriever:
-                logger.warning("No retriever available. Please setup RAG system first.")
+            if not self.client:
+                logger.warning("Weaviate client not initialized. Please setup RAG system first.")
                 return []
             
-            # Retrieve documents
-            retrieved_docs = self.retriever.get_relevant_documents(query)
+            cache_key = (self._cache_epoch, query, board_filter, class_filter, subject_filter, top_k)
+            with self._cache_lock:
+                cached_docs = self._result_cache.get(cache_key)
+            if cached_docs is not None:
+                logger.info(f"Using cached context for query: {query[:50]}...")
+                return list(cached_docs)
             
-            # Apply filters if specified
-            filtered_docs = []
-            for doc in retrieved_docs:
-                metadata = doc.metadata
-                
-                # Check board filter
-                if board_filter:
-                    doc_board = metadata.get('board', '').lower()
-                    if board_filter.lower() not in doc_board:
-                        continue
-                
-                # Check class filter
-                if class_filter:
-                    doc_class = metadata.get('class', '').lower()
-                    if class_filter.lower() not in doc_class:
-                        continue
-                
-                # Check subject filter
-                if subject_filter:
-                    doc_subject = metadata.get('subject', '').lower()
-                    if subject_filter.lower() not in doc_subject:
-                        continue
-                
-                # If all filters pass, add to filtered results
-                filtered_docs.append(doc)
+            collection = self._get_collection("EducationalDocument")
             
-            # Use filtered docs if any filters were applied, otherwise use original
-            final_docs = filtered_docs if (board_filter or class_filter or subject_filter) else retrieved_docs
+            # One hybrid (BM25 + vector) query, filtered server-side, using
+            # the cached query embedding instead of a server-side vectorizer
+            response = collection.query.hybrid(
+                query=query,
+                vector=self._embed_query(query),
+                alpha=self.HYBRID_ALPHA,
+                limit=top_k,
+                filters=self._build_where_filter(board_filter, class_filter, subject_filter),
+                return_metadata=MetadataQuery(score=True)
+            )
+            final_docs = [self._to_document(obj.properties) for obj in response.objects]
+            with self._cache_lock:
+                self._result_cache[cache_key] = final_docs
             
             filters_applied = []
             if board_filter:
@@ -304,12 +627,92 @@ class RAGManager:
             filter_str = f" ({', '.join(filters_applied)})" if filters_applied else ""
             
             logger.info(f"Retrieved {len(final_docs)} documents for query: {query[:50]}...{filter_str}")
-            return final_docs[:top_k]
+            return final_docs
             
         except Exception as e:
             logger.error(f"Error retrieving context by filters: {e}")
             return []
     
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a search query, reusing the vector for repeated queries"""
+        with self._cache_lock:
+            vector = self._query_vector_cache.get(query)
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+            with self._cache_lock:
+                self._query_vector_cache[query] = vector
+        return vector
+    
+    def backfill_lowercase_properties(self, schema_name: str = "EducationalDocument") -> int:
+        """
+        Fill the lower-cased filter fields on objects ingested before they existed
+        
+        Runs automatically when create_weaviate_schema adds the fields to an
+        existing collection; safe to re-run if that pass was interrupted.
+        
+        Args:
+            schema_name (str): Collection to backfill
+        
+        Returns:
+            int: Number of objects updated
+        """
+        return self._backfill_lowercase_properties(self._get_collection(schema_name))
+    
+    @staticmethod
+    def _backfill_lowercase_properties(collection) -> int:
+        """Set missing *_lc properties from the original ones; objects already set are skipped"""
+        sources = {name: _STORED_PROPERTY_NAMES.get(source, source) for name, source in LOWERCASE_PROPERTIES.items()}
+        updated = 0
+        for obj in collection.iterator(return_properties=list(sources) + list(sources.values())):
+            missing = {
+                name: (obj.properties.get(source) or "").strip().lower()
+                for name, source in sources.items()
+                if obj.properties.get(name) is None
+            }
+            if missing:
+                collection.data.update(uuid=obj.uuid, properties=missing)
+                updated += 1
+        logger.info(f"Backfilled lower-cased filter fields on {updated} objects")
+        return updated
+    
+    @staticmethod
+    def _build_where_filter(board_filter: Optional[str] = None, class_filter: Optional[str] = None,
+                            subject_filter: Optional[str] = None) -> Optional[Filter]:
+        """
+        Build a Weaviate filter matching all of the given board, class and subject values
+        
+        Each value must equal the stored metadata value after stripping and
+        lower-casing both (e.g. "cbse" matches "CBSE" but not "CBSE Board");
+        the comparison runs against the *_lc properties written at ingest and
+        backfilled onto older objects.
+        
+        Returns:
+            Optional[Filter]: Combined filter, or None if no filters were given
+        """
+        where_filter = None
+        for property_name, value in (("board_lc", board_filter), ("class_lc", class_filter), ("subject_lc", subject_filter)):
+            if not value:
+                continue
+            condition = Filter.by_property(property_name).equal(value.strip().lower())
+            where_filter = condition if where_filter is None else where_filter & condition
+        return where_filter
+    
+    @staticmethod
+    def _to_document(properties: Dict[str, Any]) -> Document:
+        """Convert Weaviate object properties into a langchain Document"""
+        return Document(
+            page_content=properties.get("content", ""),
+            metadata={
+                "board": properties.get("board", ""),
+                "subject": properties.get("subject", ""),
+                "class": properties.get("class_name", ""),
+                "chapter": properties.get("chapter", ""),
+                "curriculum_type": properties.get("curriculum_type", ""),
+                "region": properties.get("region", ""),
+                "topics": _parse_topics(properties.get("topics"))
+            }
+        )
+    
     def get_context_string_with_board(self, query: str, board_filter: Optional[str] = None, 
                                      class_filter: Optional[str] = None, subject_filter: Optional[str] = None, 
                                      top_k: int = 3) -> str:
@@ -342,24 +745,10 @@ class RAGManager:
                 filter_desc = " for " + ", ".join(filters) if filters else ""
                 return f"No relevant context found in the knowledge base{filter_desc}."
             
-            context_parts = []
-            for i, doc in enumerate(docs, 1):
-                metadata = doc.metadata
-                content = doc.page_content.strip()
-                
-                context_part = f"""
-Context {i}:
-Board: {metadata.get('board', 'Unknown')}
-Subject: {metadata.get('subject', 'Unknown')}
-Class: {metadata.get('class', 'Unknown')}
-Chapter: {metadata.get('chapter', 'Unknown')}
-Curriculum Type: {metadata.get('curriculum_type', 'Unknown')}
-Region: {metadata.get('region', 'Unknown')}
-Content: {content}
-"""
-                context_parts.append(context_part)
-            
-            return "\n".join(context_parts)
+            return "\n".join(
+                _CONTEXT_TEMPLATE.format_map(_ContextFields(doc.metadata, index=i, content=doc.page_content.strip()))
+                for i, doc in enumerate(docs, 1)
+            )
             
         except Exception as e:
             logger.error(f"Error getting context string with filters: {e}")
@@ -373,7 +762,7 @@ Content: {content}
             List[str]: List of board names
         """
         try:
-            if not self.vectorstore:
+            if not self.client:
                 return []
             
             # This is a simplified approach - in a real implementation,
@@ -393,13 +782,36 @@ Content: {content}
             logger.error(f"Error getting available boards: {e}")
             return []
     
+    def _get_collection(self, name: str):
+        """Return the cached collection handle, creating the collection on first use"""
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self.create_weaviate_schema(name)
+        return collection
+
     def create_weaviate_schema(self, schema_name: str = "EducationalDocument"):
         """Create Weaviate schema/collection for educational documents"""
+        if schema_name in self._collections:
+            return self._collections[schema_name]
         try:
             # Check if collection already exists
             if self.client.collections.exists(schema_name):
                 logger.info(f"{schema_name} collection already exists")
-                return self.client.collections.get(schema_name)
+                collection = self.client.collections.get(schema_name)
+                # Collections created before the lower-cased filter fields existed
+                existing = {prop.name for prop in collection.config.get().properties}
+                added = False
+                for prop in _lowercase_property_configs():
+                    if prop.name not in existing:
+                        collection.config.add_property(prop)
+                        added = True
+                        logger.info(f"Added {prop.name} property to {schema_name}")
+                if added:
+                    # Filters match only the new fields, so fill them on the
+                    # objects already stored
+                    self._backfill_lowercase_properties(collection)
+                self._collections[schema_name] = collection
+                return collection
 
             # Create collection with properties
             collection = self.client.collections.create(
@@ -444,7 +856,8 @@ Content: {content}
                         name="topics",
                         data_type=weaviate_config.DataType.TEXT,
                         description="Topics covered in the document"
-                    )
+                    ),
+                    *_lowercase_property_configs()
                 ],
                 # No vectorizer - we'll provide embeddings manually
                 vectorizer_config=weaviate_config.Configure.Vectorizer.none(),
@@ -454,90 +867,231 @@ Content: {content}
             )
             
             logger.info("EducationalDocument collection created successfully")
+            self._collections[schema_name] = collection
             return collection
             
         except Exception as e:
             logger.error(f"Error creating Weaviate schema: {e}")
             raise
 
-    def add_documents_to_weaviate(self, documents: List[Any], collection_name: str = "EducationalDocument"):
+    def add_documents_to_weaviate(self, documents: Iterable[Any], collection_name: str = "EducationalDocument") -> int:
         """
         Add documents with metadata to Weaviate
         
+        Documents are consumed in slices, so a generator is never
+        materialized in full and memory stays bounded by a few slices.
+        
         Args:
-            documents: List of PageContent objects or similar
+            documents: Iterable of PageContent objects or similar
             collection_name: Name of the Weaviate collection
+        
+        Returns:
+            int: Number of documents inserted
         """
         try:
             logger.info("Creating Weaviate collection...")
             # Create or get collection
-            collection = self.create_weaviate_schema(collection_name)
-
-            # Prepare data for batch insertion
-            data_objects = []
-            pdb.set_trace()
-            for i, doc in enumerate(documents):  # Fixed: Added enumerate
-                # Convert PageContent to dictionary format
-                if hasattr(doc, 'content') and hasattr(doc, 'metadata'):
-                    # Handle PageContent objects
-                    content = doc.content
-                    metadata = doc.metadata
-                elif isinstance(doc, dict):
-                    # Handle dictionary objects
-                    content = doc.get('content', '')
-                    metadata = doc.get('metadata', {})
-                else:
-                    logger.warning(f"Unsupported document type: {type(doc)}")
-                    continue
-
-                # Generate embeddings using your GoogleGenerativeAIEmbeddings instance
-                try:
-                    logger.info(f"Generating embedding for document {i+1}/{len(documents)}")
-                    content_vector = self.embeddings.embed_query(content)
-                    logger.debug(f"Generated {len(content_vector)}-dimensional embedding for content of length {len(content)}")
-                except Exception as e:
-                    logger.error(f"Failed to generate embedding for document {i+1}: {e}")
-                    continue 
-                
-                # Prepare properties for Weaviate
-                properties = {
-                    "content": content,
-                    "subject": metadata.get("subject", ""),
-                    "class_name": metadata.get("class", ""),
-                    "chapter": metadata.get("chapter", ""),
-                    "board": metadata.get("board", ""),
-                    "region": metadata.get("region", ""),
-                    "curriculum_type": metadata.get("curriculum_type", ""),
-                    "topics": str(metadata.get("topics", []))
-                }
-                
-                # Add object with vector
-                data_objects.append({
-                    "properties": properties,
-                    "vector": content_vector
-                })
-            
-            logger.info(f"Inserting {len(data_objects)} documents into Weaviate...")
-            pdb.set_trace()
-            # Batch insert documents
-            with collection.batch.dynamic() as batch:
-                for i, obj in enumerate(data_objects):
-                    # Fixed: Pass both properties AND vector to Weaviate
-                    batch.add_object(
-                        properties=obj["properties"],
-                        vector=obj["vector"]
-                    )
-                    pdb.set_trace()
-                    if (i + 1) % 10 == 0:  # Log progress every 10 items
-                        logger.info(f"Processed {i + 1}/{len(data_objects)} documents")
-            
-            logger.info(f"Successfully added {len(data_objects)} documents to Weaviate")
+            collection = self._get_collection(collection_name)
+
+            inserted_count, failed_count = run_coroutine(self._ingest(collection, iter(documents)))
+
+            # Invalidate cached retrieval results now that the collection changed
+            self._cache_epoch += 1
+            self.inserted_count += inserted_count
+
+            if failed_count:
+                logger.error(f"{failed_count} documents failed to insert into Weaviate")
+
+            logger.info(f"Successfully added {inserted_count} documents to Weaviate")
+            return inserted_count
             
         except Exception as e:
             logger.error(f"Error adding documents to Weaviate: {e}")
             raise
 
-    def retrieve_hybrid_search(self, query: str, alpha: float = 0.8, top_k: int = 5, where_filter: Optional[Dict] = None) -> List[Dict]:
+    async def _ingest(self, collection, documents: Iterator[Any]) -> Tuple[int, int]:
+        """
+        Embed and insert documents as a two-stage pipeline
+        
+        The next slice is chunked and embedded while the previous one is
+        being inserted; the bounded queue caps how many embedded slices
+        wait in memory.
+        
+        Args:
+            collection: Weaviate collection handle
+            documents (Iterator[Any]): PageContent objects or dicts
+        
+        Returns:
+            Tuple[int, int]: Number of inserted and failed objects
+        """
+        # Enough documents per slice to keep every concurrent embeddings call busy
+        slice_size = self.embed_batch_size * self.embed_concurrency
+        queue = asyncio.Queue(maxsize=2)
+
+        async def embed_slices():
+            try:
+                while True:
+                    # Pulling from the chunk generator is CPU work, keep it off the loop
+                    document_slice = await asyncio.to_thread(lambda: list(islice(documents, slice_size)))
+                    if not document_slice:
+                        break
+                    entries = self._to_entries(document_slice)
+
+                    # Generate embeddings concurrently, one batch of chunks per API call
+                    logger.info(f"Generating embeddings for {len(entries)} documents...")
+                    content_vectors = await self._embed_all([content for content, _ in entries])
+                    await queue.put(self._to_objects(entries, content_vectors))
+            finally:
+                await queue.put(None)
+
+        producer = asyncio.create_task(embed_slices())
+        inserted_count = failed_count = 0
+        while True:
+            objects = await queue.get()
+            if objects is None:
+                break
+            inserted, failed = await self._insert_windowed(collection, objects)
+            inserted_count += inserted
+            failed_count += failed
+        # Surface any embedding-side error
+        await producer
+        return inserted_count, failed_count
+
+    @staticmethod
+    def _to_objects(entries: List[Tuple[str, Dict[str, Any]]], vectors: List[Optional[np.ndarray]]) -> List[DataObject]:
+        """Build Weaviate objects for entries whose embedding succeeded"""
+        objects = []
+        for (content, metadata), content_vector in zip(entries, vectors):
+            if content_vector is None:
+                continue
+
+            # Prepare properties for Weaviate
+            properties = {
+                "content": content,
+                "subject": metadata.get("subject", ""),
+                "class_name": metadata.get("class", ""),
+                "chapter": metadata.get("chapter", ""),
+                "board": metadata.get("board", ""),
+                "region": metadata.get("region", ""),
+                "curriculum_type": metadata.get("curriculum_type", ""),
+                "topics": json.dumps(metadata.get("topics", []) or [], separators=(",", ":"))
+            }
+            for name, source in LOWERCASE_PROPERTIES.items():
+                properties[name] = metadata.get(source, "").strip().lower()
+
+            objects.append(DataObject(properties=properties, vector=content_vector))
+        return objects
+
+    async def _insert_windowed(self, collection, objects: List[DataObject]) -> Tuple[int, int]:
+        """
+        Insert objects with insert_many, keeping a window of batch requests in flight
+        
+        Each wave submits insert_concurrent_requests batches of
+        insert_batch_size objects and waits for all of them before the next.
+        Objects that fail are retried in another pass.
+        
+        Args:
+            collection: Weaviate collection handle
+            objects (List[DataObject]): Objects with properties and vectors
+        
+        Returns:
+            Tuple[int, int]: Number of inserted and failed objects
+        """
+        inserted = 0
+        pending = objects
+        for attempt in range(self.INSERT_MAX_ATTEMPTS):
+            if not pending:
+                break
+            if attempt:
+                logger.warning(f"Retrying {len(pending)} documents that failed to insert")
+            batches = [pending[i:i + self.insert_batch_size] for i in range(0, len(pending), self.insert_batch_size)]
+            failed_objects = []
+            for wave_start in range(0, len(batches), self.insert_concurrent_requests):
+                wave = batches[wave_start:wave_start + self.insert_concurrent_requests]
+                results = await asyncio.gather(
+                    *(asyncio.to_thread(collection.data.insert_many, batch) for batch in wave),
+                    return_exceptions=True
+                )
+                for batch, result in zip(wave, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Failed to insert {len(batch)} documents into Weaviate: {result}")
+                        failed_objects.extend(batch)
+                        continue
+                    if result.has_errors:
+                        first_error = next(iter(result.errors.values()))
+                        logger.error(f"{len(result.errors)} documents failed to insert into Weaviate: {first_error.message}")
+                        failed_objects.extend(batch[i] for i in result.errors)
+                    inserted += len(batch) - len(result.errors)
+            pending = failed_objects
+        return inserted, len(pending)
+
+    @staticmethod
+    def _to_entries(documents: Iterable[Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Normalize documents into (content, metadata) pairs"""
+        entries = []
+        for doc in documents:
+            if hasattr(doc, 'content') and hasattr(doc, 'metadata'):
+                # Handle PageContent and ChunkRecord objects
+                entries.append((doc.content, doc.metadata))
+            elif isinstance(doc, dict):
+                # Handle dictionary objects
+                entries.append((doc.get('content', ''), doc.get('metadata', {})))
+            else:
+                logger.warning(f"Unsupported document type: {type(doc)}")
+        return entries
+
+    async def _embed_all(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Embed texts, reusing cached vectors and batching the rest with a
+        bounded number of concurrent API calls
+        
+        Args:
+            texts (List[str]): Texts to embed
+        
+        Returns:
+            List[Optional[np.ndarray]]: One float32 vector per text, None where its batch failed
+        """
+        model_name = self.embeddings.model
+        keys = [f"{model_name}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}" for text in texts]
+        vectors = [self.embedding_cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        # Entries cached before vectors were stored as float32 are plain lists
+        vectors = [vector if vector is None else np.asarray(vector, dtype=np.float32) for vector in vectors]
+        if len(missing) < len(texts):
+            logger.info(f"Reusing cached embeddings for {len(texts) - len(missing)}/{len(texts)} documents")
+
+        semaphore = asyncio.Semaphore(self.embed_concurrency)
+        starts = range(0, len(missing), self.embed_batch_size)
+
+        async def embed_batch(start: int) -> List[List[float]]:
+            async with semaphore:
+                batch_texts = [texts[i] for i in missing[start:start + self.embed_batch_size]]
+                logger.debug("Generating embeddings for documents %d-%d/%d", start + 1, start + len(batch_texts), len(missing))
+                for attempt in range(self.EMBED_MAX_ATTEMPTS):
+                    try:
+                        return await self.embeddings.aembed_documents(batch_texts)
+                    except Exception as e:
+                        if attempt == self.EMBED_MAX_ATTEMPTS - 1:
+                            raise
+                        delay = self.EMBED_RETRY_DELAY * 2 ** attempt
+                        logger.warning(f"Embeddings batch failed ({e}), retrying in {delay:.0f}s")
+                        await asyncio.sleep(delay)
+
+        results = await asyncio.gather(*(embed_batch(start) for start in starts), return_exceptions=True)
+
+        for start, result in zip(starts, results):
+            batch_indices = missing[start:start + self.embed_batch_size]
+            if isinstance(result, Exception):
+                logger.error(f"Failed to generate embeddings for {len(batch_indices)} documents: {result}")
+                continue
+            # float32 arrays are a flat buffer, a fraction of the size of a
+            # list of Python floats, both in memory and in the cache
+            for i, vector in zip(batch_indices, np.asarray(result, dtype=np.float32)):
+                vectors[i] = vector
+                self.embedding_cache[keys[i]] = vector
+        return vectors
+
+    def retrieve_hybrid_search(self, query: str, alpha: float = 0.8, top_k: int = 5, where_filter: Optional[Filter] = None) -> List[Dict]:
         """
         Perform hybrid search combining vector similarity and keyword search
         
@@ -545,7 +1099,7 @@ Content: {content}
             query (str): Search query
             alpha (float): Weight for vector search vs keyword search (0.0 = pure keyword, 1.0 = pure vector)
             top_k (int): Number of results to return
-            where_filter (Dict, optional): Metadata filters
+            where_filter (Filter, optional): Metadata filters, e.g. from _build_where_filter
         
         Returns:
             List[Dict]: Search results with content, metadata, and scores
@@ -555,10 +1109,10 @@ Content: {content}
                 logger.error("Weaviate client not initialized")
                 return []
             
-            collection = self.client.collections.get("EducationalDocument")
+            collection = self._get_collection("EducationalDocument")
             
             # Generate query embedding for vector search
-            query_vector = self.embeddings.embed_query(query)
+            query_vector = self._embed_query(query)
             
             # Build hybrid search query
             search_query = collection.query.hybrid(
@@ -566,7 +1120,8 @@ Content: {content}
                 vector=query_vector,
                 alpha=alpha,
                 limit=top_k,
-                where=where_filter
+                filters=where_filter,
+                return_metadata=MetadataQuery(score=True, explain_score=True)
             )
             
             # Execute search
@@ -584,7 +1139,7 @@ Content: {content}
                         "board": result.properties.get("board", ""),
                         "region": result.properties.get("region", ""),
                         "curriculum_type": result.properties.get("curriculum_type", ""),
-                        "topics": result.properties.get("topics", "")
+                        "topics": _parse_topics(result.properties.get("topics"))
                     },
                     "score": getattr(result.metadata, 'score', 0.0),
                     "explain_score": getattr(result.metadata, 'explain_score', None)
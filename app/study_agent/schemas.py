@@ -0,0 +1,109 @@
+"""
+Structured output schemas for Gemini responses in the educational tutor system
+"""
+from typing import Any, Dict, List, Literal, Optional, Type
+from pydantic import BaseModel, Field
+
+# Keys understood by Gemini's response_schema (an OpenAPI subset)
+_GEMINI_SCHEMA_KEYS = {"type", "format", "description", "nullable", "enum", "properties", "required", "items"}
+
+class IntentSplit(BaseModel):
+    """Student intent plus the problem and any student work found in the image text"""
+    intent: Literal["evaluation", "solve"]
+    problem_statement: str
+    student_solution: Optional[str] = None
+
+class EvaluationResult(BaseModel):
+    """Evaluation of a student's solution"""
+    is_correct: bool
+    score: int = Field(ge=0, le=10)
+    correct_answer: str
+    explanation: str
+    student_strengths: List[str]
+    areas_for_improvement: List[str]
+    method_used: str
+
+class SolutionStep(BaseModel):
+    """A single step of a worked solution"""
+    step_number: int
+    description: str
+    calculation: str
+    result: str
+
+class StepByStepSolution(BaseModel):
+    """Step-by-step solution to a math problem"""
+    final_answer: str
+    solution_steps: List[SolutionStep]
+    explanation: str
+    key_concepts: List[str]
+    tips: List[str]
+    difficulty_level: str
+    time_needed: str
+
+class ProblemAnalysis(BaseModel):
+    """Categorization of a math problem"""
+    problem_type: str
+    difficulty: str
+    estimated_time: str
+    required_concepts: List[str]
+    is_word_problem: bool
+    operations_needed: List[str]
+
+class ContextQuestion(BaseModel):
+    """Practice question grounded in textbook context"""
+    question: str
+    difficulty: str
+    concept: str
+    context_reference: str
+
+class ProgressiveQuestion(BaseModel):
+    """Practice question at a given step of a difficulty progression"""
+    question: str
+    difficulty_level: str
+    learning_focus: str
+
+def to_gemini_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Convert a Pydantic model into the schema dialect accepted by Gemini
+
+    Inlines $ref definitions, maps Optional fields to nullable and drops
+    JSON-schema keywords (title, minimum, ...) that Gemini rejects.
+
+    Args:
+        model (Type[BaseModel]): Pydantic model describing the response
+
+    Returns:
+        Dict[str, Any]: Schema usable as GenerationConfig.response_schema
+    """
+    json_schema = model.model_json_schema()
+    definitions = json_schema.get("$defs", {})
+
+    def convert(node: Dict[str, Any]) -> Dict[str, Any]:
+        if "$ref" in node:
+            node = definitions[node["$ref"].split("/")[-1]]
+        if "anyOf" in node:
+            variants = [v for v in node["anyOf"] if v.get("type") != "null"]
+            converted = convert(variants[0])
+            if len(variants) < len(node["anyOf"]):
+                converted["nullable"] = True
+            return converted
+
+        converted = {key: value for key, value in node.items() if key in _GEMINI_SCHEMA_KEYS}
+        if "properties" in converted:
+            converted["properties"] = {name: convert(prop) for name, prop in converted["properties"].items()}
+        if "items" in converted:
+            converted["items"] = convert(converted["items"])
+        return converted
+
+    return convert(json_schema)
+
+INTENT_SPLIT_SCHEMA = to_gemini_schema(IntentSplit)
+EVALUATION_RESULT_SCHEMA = to_gemini_schema(EvaluationResult)
+STEP_BY_STEP_SOLUTION_SCHEMA = to_gemini_schema(StepByStepSolution)
+
+PROBLEM_ANALYSIS_SCHEMA = to_gemini_schema(ProblemAnalysis)
+CONTEXT_QUESTIONS_SCHEMA = {"type": "array", "items": to_gemini_schema(ContextQuestion)}
+PROGRESSIVE_QUESTIONS_SCHEMA = {"type": "array", "items": to_gemini_schema(ProgressiveQuestion)}
+
+# Plain string lists: similar/themed questions and learning objectives
+STRING_LIST_SCHEMA = {"type": "array", "items": {"type": "string"}}
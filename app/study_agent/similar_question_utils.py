@@ -1,21 +1,48 @@
 """
 Similar questions utility for generating context-aware or LLM-native similar questions
 """
-import pdb
+import asyncio
 import google.generativeai as genai
-import os
 from typing import List, Dict, Any, Optional
-import json
+import orjson
+import random
 import logging
-from app.study_agent.prompts import PromptFormatter
-from langchain.output_parsers import PydanticOutputParser
-from langchain.schema import OutputParserException
-from pydantic import BaseModel, Field
+from app.study_agent.prompts import PromptFormatter, QUESTION_THEMES
+from app.study_agent.schemas import (
+    CONTEXT_QUESTIONS_SCHEMA,
+    PROGRESSIVE_QUESTIONS_SCHEMA,
+    STRING_LIST_SCHEMA,
+)
+from app.study_agent.async_utils import run_coroutine
+from app.study_agent.gemini_utils import generate_content, with_gemini
+from app.study_agent.llm_cache import SemanticCache, semantic_cache
+from pydantic import TypeAdapter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def generate_similar_questions(problem_statement: str, context: str = "", num_questions: int = 3, api_key: Optional[str] = None) -> List[str]:
+_FALLBACK_QUESTIONS = (
+    "Solve: 25 + 17 = ?",
+    "What is 8 × 6?",
+    "If you have 50 stickers and give away 23, how many do you have left?",
+    "A box has 4 rows of 7 chocolates. How many chocolates in total?",
+    "Find the missing number: 15 + ___ = 28"
+)
+
+# Validator for a list of question strings, built once at import
+_QUESTIONS_ADAPTER = TypeAdapter(List[str])
+
+# Generated questions for repeated or reworded problems, shared across requests
+_similar_questions_cache = SemanticCache(maxsize=1024)
+
+@semantic_cache(
+    _similar_questions_cache,
+    key_fn=lambda problem_statement, context="", num_questions=3, api_key=None: problem_statement,
+    scope_fn=lambda problem_statement, context="", num_questions=3, api_key=None: f"{context}|{num_questions}",
+    should_cache=lambda questions: questions != generate_fallback_questions("", len(questions))
+)
+@with_gemini()
+def generate_similar_questions(problem_statement: str, context: str = "", num_questions: int = 3, api_key: Optional[str] = None, model: Optional[genai.GenerativeModel] = None) -> List[str]:
     """
     Generate similar questions based on the original problem
     
@@ -24,20 +51,12 @@ def generate_similar_questions(problem_statement: str, context: str = "", num_qu
         context (str): Relevant context from RAG system
         num_questions (int): Number of similar questions to generate
         api_key (str, optional): Google API key
+        model (genai.GenerativeModel): Shared model, injected by with_gemini
     
     Returns:
         List[str]: List of similar questions
     """
     try:
-        # Configure API key
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
-        
-        model = genai.GenerativeModel("gemini-1.5-pro")
         # Create prompt for similar question generation
         prompt = PromptFormatter.get_similar_questions_prompt(
             problem_statement=problem_statement,
@@ -45,37 +64,32 @@ def generate_similar_questions(problem_statement: str, context: str = "", num_qu
             num_questions=num_questions
         )
 
-        response = model.generate_content(prompt)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=STRING_LIST_SCHEMA
+            )
+        )
         
         if response.text:
             try:
-                # Parse JSON response
-                pdb.set_trace()
-                # Clean the response text
-                cleaned_text = clean_json_response(response.text)
-                parsed_data = json.loads(cleaned_text)
-                # Handle dictionary format like {"1": "question1", "2": "question2"}
-                if isinstance(parsed_data, dict):
-                    questions = list(parsed_data.values())
-                # Handle array format like ["question1", "question2", "question3"]
-                elif isinstance(parsed_data, list):
-                    questions = parsed_data
-                else:
-                    logger.warning(f"Unexpected data type: {type(parsed_data)}")
-                    return generate_fallback_questions(problem_statement, num_questions)
+                # Parses and validates in one pass; ValidationError is a ValueError
+                questions = _QUESTIONS_ADAPTER.validate_json(response.text)
 
                 # Validate response
-                if isinstance(questions, list) and len(questions) == num_questions:
+                if len(questions) == num_questions:
                     logger.info(f"Successfully generated {len(questions)} similar questions")
                     return questions
-                elif isinstance(questions, list) and len(questions) > 0:
+                elif len(questions) > 0:
                     logger.warning(f"Expected {num_questions} questions, got {len(questions)}, returning what we have")
                     return questions[:num_questions]  # Return up to the requested number
                 else:
                     logger.warning("Invalid response format, using fallback method")
                     return generate_fallback_questions(problem_statement, num_questions)
                     
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 logger.error(f"Could not parse JSON response: {e}")
                 return generate_fallback_questions(problem_statement, num_questions)
         else:
@@ -86,33 +100,8 @@ def generate_similar_questions(problem_statement: str, context: str = "", num_qu
         logger.error(f"Error generating similar questions: {str(e)}")
         return generate_fallback_questions(problem_statement, num_questions)
     
-def clean_json_response(response_text: str) -> str:
-    """
-    Clean response text to extract JSON content
-    Handles markdown code blocks and other formatting
-    
-    Args:
-        response_text (str): Raw response text
-    
-    Returns:
-        str: Cleaned JSON string
-    """
-    # Remove markdown code blocks
-    if '```json' in response_text:
-        start = response_text.find('```json') + 7
-        end = response_text.find('```', start)
-        if end != -1:
-            response_text = response_text[start:end]
-    elif '```' in response_text:
-        start = response_text.find('```') + 3
-        end = response_text.find('```', start)
-        if end != -1:
-            response_text = response_text[start:end]
-    
-    # Strip whitespace and newlines
-    return response_text.strip()
-
-def generate_context_aware_questions(problem_statement: str, context: str, num_questions: int = 3, api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+@with_gemini()
+def generate_context_aware_questions(problem_statement: str, context: str, num_questions: int = 3, api_key: Optional[str] = None, model: Optional[genai.GenerativeModel] = None) -> List[Dict[str, Any]]:
     """
     Generate questions that are specifically based on the context from textbook
     
@@ -121,62 +110,42 @@ def generate_context_aware_questions(problem_statement: str, context: str, num_q
         context (str): Context from RAG system
         num_questions (int): Number of questions to generate
         api_key (str, optional): Google API key
+        model (genai.GenerativeModel): Shared model, injected by with_gemini
     
     Returns:
         List[Dict[str, Any]]: List of questions with metadata
     """
     try:
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
-        
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        
-        prompt = f"""
-        You are creating practice questions using content from a Class 5 math textbook.
-        
-        ORIGINAL PROBLEM: {problem_statement}
-        
-        TEXTBOOK CONTEXT: {context}
-        
-        Using the concepts, examples, and methods from the textbook context, create {num_questions} practice questions.
-        
-        Return as JSON array with this format:
-        [
-            {{
-                "question": "the question text",
-                "difficulty": "easy/medium/hard",
-                "concept": "main mathematical concept",
-                "context_reference": "which part of context this relates to"
-            }}
-        ]
-        
-        Make sure questions align with the textbook content and use similar examples/scenarios.
-        """
-        
-        response = model.generate_content(prompt)
+        prompt = PromptFormatter.get_context_aware_questions_prompt(problem_statement, context, num_questions)
+        
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=CONTEXT_QUESTIONS_SCHEMA
+            )
+        )
         
         if response.text:
             try:
-                questions = json.loads(response.text.strip())
+                questions = orjson.loads(response.text)
                 if isinstance(questions, list):
                     logger.info(f"Successfully generated {len(questions)} context-aware questions")
                     return questions
                 else:
-                    return convert_to_question_dict(generate_similar_questions(problem_statement, context, num_questions, api_key))
-            except json.JSONDecodeError:
-                return convert_to_question_dict(generate_similar_questions(problem_statement, context, num_questions, api_key))
+                    return convert_to_question_dict(generate_fallback_questions(problem_statement, num_questions))
+            except orjson.JSONDecodeError:
+                return convert_to_question_dict(generate_fallback_questions(problem_statement, num_questions))
         else:
-            return convert_to_question_dict(generate_similar_questions(problem_statement, context, num_questions, api_key))
+            return convert_to_question_dict(generate_fallback_questions(problem_statement, num_questions))
             
     except Exception as e:
         logger.error(f"Error generating context-aware questions: {str(e)}")
-        return convert_to_question_dict(generate_similar_questions(problem_statement, context, num_questions, api_key))
+        return convert_to_question_dict(generate_fallback_questions(problem_statement, num_questions))
 
-def generate_progressive_questions(problem_statement: str, num_questions: int = 3, api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+@with_gemini()
+def generate_progressive_questions(problem_statement: str, num_questions: int = 3, api_key: Optional[str] = None, model: Optional[genai.GenerativeModel] = None) -> List[Dict[str, Any]]:
     """
     Generate questions with progressive difficulty levels
     
@@ -184,71 +153,46 @@ def generate_progressive_questions(problem_statement: str, num_questions: int =
         problem_statement (str): Original problem
         num_questions (int): Number of questions to generate
         api_key (str, optional): Google API key
+        model (genai.GenerativeModel): Shared model, injected by with_gemini
     
     Returns:
         List[Dict[str, Any]]: Questions with progressive difficulty
     """
     try:
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
-        
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        
-        prompt = f"""
-        Create {num_questions} practice questions based on this problem with PROGRESSIVE DIFFICULTY.
-        
-        ORIGINAL PROBLEM: {problem_statement}
-        
-        Generate questions that get progressively harder:
-        1. First question: EASIER than original (simpler numbers/scenario)
-        2. Middle question(s): SIMILAR difficulty to original
-        3. Last question: SLIGHTLY HARDER than original (but still appropriate for Class 5)
-        
-        Return as JSON:
-        [
-            {{
-                "question": "easier question text",
-                "difficulty_level": "easier",
-                "learning_focus": "building confidence"
-            }},
-            {{
-                "question": "similar question text", 
-                "difficulty_level": "similar",
-                "learning_focus": "reinforcing concept"
-            }},
-            {{
-                "question": "harder question text",
-                "difficulty_level": "harder", 
-                "learning_focus": "extending understanding"
-            }}
-        ]
-        """
+        prompt = PromptFormatter.get_progressive_questions_prompt(
+            problem_statement=problem_statement,
+            num_questions=num_questions
+        )
         
-        response = model.generate_content(prompt)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=PROGRESSIVE_QUESTIONS_SCHEMA
+            )
+        )
         
         if response.text:
             try:
-                questions = json.loads(response.text.strip())
+                questions = orjson.loads(response.text)
                 if isinstance(questions, list):
                     logger.info(f"Successfully generated {len(questions)} progressive questions")
                     return questions
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
         
-        # Fallback to regular similar questions
-        simple_questions = generate_similar_questions(problem_statement, "", num_questions, api_key)
+        # Fallback without a second model call
+        simple_questions = generate_fallback_questions(problem_statement, num_questions)
         return [{"question": q, "difficulty_level": "similar", "learning_focus": "practice"} for q in simple_questions]
         
     except Exception as e:
         logger.error(f"Error generating progressive questions: {str(e)}")
-        simple_questions = generate_similar_questions(problem_statement, "", num_questions, api_key)
+        simple_questions = generate_fallback_questions(problem_statement, num_questions)
         return [{"question": q, "difficulty_level": "similar", "learning_focus": "practice"} for q in simple_questions]
 
-def generate_themed_questions(problem_statement: str, theme: str = "random", num_questions: int = 3, api_key: Optional[str] = None) -> List[str]:
+@with_gemini()
+def generate_themed_questions(problem_statement: str, theme: str = "random", num_questions: int = 3, api_key: Optional[str] = None, model: Optional[genai.GenerativeModel] = None) -> List[str]:
     """
     Generate similar questions with a specific theme
     
@@ -257,56 +201,45 @@ def generate_themed_questions(problem_statement: str, theme: str = "random", num
         theme (str): Theme for questions (animals, sports, food, school, etc.)
         num_questions (int): Number of questions
         api_key (str, optional): Google API key
+        model (genai.GenerativeModel): Shared model, injected by with_gemini
     
     Returns:
         List[str]: Themed questions
     """
     try:
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            raise ValueError("Google API key not provided")
-        
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        
         # Select random theme if not specified
-        if theme == "random":
-            themes = ["animals", "sports", "food", "toys", "school", "nature", "vehicles", "family"]
-            import random
-            theme = random.choice(themes)
+        theme = random.choice(QUESTION_THEMES) if theme == "random" else theme
         
-        prompt = f"""
-        Create {num_questions} math questions similar to the original, but all with a "{theme}" theme.
-        
-        ORIGINAL PROBLEM: {problem_statement}
-        THEME: {theme}
-        
-        Make all questions relate to {theme} while maintaining the same mathematical concepts.
-        Use {theme}-related objects, scenarios, and contexts that Class 5 students would enjoy.
-        
-        Return as JSON array:
-        ["themed question 1", "themed question 2", "themed question 3"]
-        """
+        prompt = PromptFormatter.get_themed_questions_prompt(
+            problem_statement=problem_statement,
+            theme=theme,
+            num_questions=num_questions
+        )
         
-        response = model.generate_content(prompt)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=STRING_LIST_SCHEMA
+            )
+        )
         
         if response.text:
             try:
-                questions = json.loads(response.text.strip())
+                questions = orjson.loads(response.text)
                 if isinstance(questions, list):
                     logger.info(f"Successfully generated {len(questions)} {theme}-themed questions")
                     return questions
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
         
         # Fallback
-        return generate_similar_questions(problem_statement, "", num_questions, api_key)
+        return generate_fallback_questions(problem_statement, num_questions)
         
     except Exception as e:
         logger.error(f"Error generating themed questions: {str(e)}")
-        return generate_similar_questions(problem_statement, "", num_questions, api_key)
+        return generate_fallback_questions(problem_statement, num_questions)
 
 def generate_fallback_questions(problem_statement: str, num_questions: int = 3) -> List[str]:
     """
@@ -319,15 +252,8 @@ def generate_fallback_questions(problem_statement: str, num_questions: int = 3)
     Returns:
         List[str]: Basic fallback questions
     """
-    fallback_questions = [
-        "Solve: 25 + 17 = ?",
-        "What is 8 × 6?", 
-        "If you have 50 stickers and give away 23, how many do you have left?",
-        "A box has 4 rows of 7 chocolates. How many chocolates in total?",
-        "Find the missing number: 15 + ___ = 28"
-    ]
-    
-    return fallback_questions[:num_questions]
+    # Callers may append to or edit the result, so hand out a fresh list
+    return list(_FALLBACK_QUESTIONS[:num_questions])
 
 def convert_to_question_dict(questions: List[str]) -> List[Dict[str, Any]]:
     """
@@ -353,6 +279,21 @@ def generate_comprehensive_question_set(problem_statement: str, context: str = "
     """
     Generate a comprehensive set of questions with different types
     
+    Args:
+        problem_statement (str): Original problem
+        context (str): Context from RAG system
+        api_key (str, optional): Google API key
+    
+    Returns:
+        Dict[str, Any]: Comprehensive question set
+    """
+    return run_coroutine(generate_comprehensive_question_set_async(problem_statement, context, api_key))
+
+async def generate_comprehensive_question_set_async(problem_statement: str, context: str = "", api_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generate a comprehensive set of questions, issuing the independent
+    Gemini requests concurrently
+    
     Args:
         problem_statement (str): Original problem
         context (str): Context from RAG system
@@ -362,10 +303,12 @@ def generate_comprehensive_question_set(problem_statement: str, context: str = "
         Dict[str, Any]: Comprehensive question set
     """
     try:
-        # Generate different types of questions
-        similar_questions = generate_similar_questions(problem_statement, context, 3, api_key)
-        progressive_questions = []#generate_progressive_questions(problem_statement, 3, api_key)
-        themed_questions = []#generate_themed_questions(problem_statement, "random", 2, api_key)
+        # The three generators are independent, so wall time is the slowest call
+        similar_questions, progressive_questions, themed_questions = await asyncio.gather(
+            asyncio.to_thread(generate_similar_questions, problem_statement, context, 3, api_key),
+            asyncio.to_thread(generate_progressive_questions, problem_statement, 3, api_key),
+            asyncio.to_thread(generate_themed_questions, problem_statement, "random", 2, api_key)
+        )
         
         question_set = {
             "similar_questions": similar_questions,
@@ -1,18 +1,66 @@
 """
 Solve utility for providing step-by-step solutions to math problems
 """
+import asyncio
+import copy
 import google.generativeai as genai
-import os
+from types import MappingProxyType
 from typing import Dict, Any, Optional, List
-import json
+import orjson
 import logging
-import pdb
+from app.study_agent.prompts import PromptFormatter
+from app.study_agent.schemas import (
+    PROBLEM_ANALYSIS_SCHEMA,
+    STEP_BY_STEP_SOLUTION_SCHEMA,
+    STRING_LIST_SCHEMA,
+    ProblemAnalysis,
+)
+from app.study_agent.async_utils import run_coroutine
+from app.study_agent.gemini_utils import generate_content, with_gemini
+from app.study_agent.llm_cache import SemanticCache, semantic_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def solve_problem(problem_statement: str, api_key: str, context: str = "") -> Dict[str, Any]:
+_FALLBACK_FINAL_ANSWER = "Unable to solve automatically"
+
+# Values for solution fields the model left out
+_SOLUTION_DEFAULTS = MappingProxyType({
+    "final_answer": "Unable to determine",
+    "solution_steps": [],
+    "explanation": "Unable to provide detailed solution due to technical issues.",
+    "key_concepts": ["Basic arithmetic"],
+    "tips": ["Practice similar problems"],
+    "difficulty_level": "medium",
+    "time_needed": "5-10 minutes"
+})
+
+_FALLBACK_OBJECTIVES = (
+    "Practice arithmetic operations",
+    "Develop problem-solving skills",
+    "Apply mathematical concepts to real situations"
+)
+_ERROR_OBJECTIVES = ("Practice mathematical thinking",)
+
+# Problem analyses and learning objectives depend only on the problem text.
+# They are cheap calls, so only exact (normalized) repeats are served from
+# cache, and entries expire after an hour.
+_analysis_cache = SemanticCache(maxsize=4096, embed_fn=None, ttl=3600)
+_objectives_cache = SemanticCache(maxsize=4096, embed_fn=None, ttl=3600)
+
+# Solutions for repeated problems, shared across requests. Exact matches
+# only: a reworded problem with a different operation ("8 + 6" vs "8 - 6")
+# embeds almost identically, and a wrong cached answer is worse than a call.
+_solution_cache = SemanticCache(maxsize=1024, embed_fn=None)
+
+@semantic_cache(
+    _solution_cache,
+    key_fn=lambda problem_statement, api_key, context="": f"{problem_statement}|{context}",
+    should_cache=lambda result: result.get("final_answer") != _FALLBACK_FINAL_ANSWER
+)
+@with_gemini()
+def solve_problem(problem_statement: str, api_key: str, context: str = "", model: Optional[genai.GenerativeModel] = None) -> Dict[str, Any]:
     """
     Solve math problem step-by-step with detailed explanation
     
@@ -20,79 +68,32 @@ def solve_problem(problem_statement: str, api_key: str, context: str = "") -> Di
         problem_statement (str): The math problem to solve
         context (str): Relevant context from RAG system
         api_key (str, optional): Google API key
+        model (genai.GenerativeModel): Shared model, injected by with_gemini
     
     Returns:
         Dict[str, Any]: Solution with steps and explanation
     """
     try:
-        pdb.set_trace()
-        model = genai.GenerativeModel("gemini-1.5-pro", api_key=api_key)
-
         # Create comprehensive solving prompt
-        prompt = f"""
-        You are an expert Class 5 mathematics tutor. Solve this problem step-by-step in a way that's easy for a 10-year-old student to understand.
-        
-        PROBLEM: {problem_statement}
-        
-        RELEVANT CONTEXT (from textbook): {context if context else "No additional context available"}
-        
-        Please provide:
-        
-        1. SOLUTION_STEPS: Break down the solution into clear, numbered steps
-        2. FINAL_ANSWER: The correct final answer
-        3. EXPLANATION: Explain the reasoning behind each step
-        4. KEY_CONCEPTS: List the mathematical concepts used
-        5. TIPS: Helpful tips for solving similar problems
-        
-        Return your response as a JSON object with this exact format:
-        {{
-            "final_answer": "the correct answer as a string",
-            "solution_steps": [
-                {{
-                    "step_number": 1,
-                    "description": "what to do in this step",
-                    "calculation": "the actual calculation if any",
-                    "result": "result of this step"
-                }},
-                {{
-                    "step_number": 2,
-                    "description": "what to do in this step",
-                    "calculation": "the actual calculation if any", 
-                    "result": "result of this step"
-                }}
-            ],
-            "explanation": "overall explanation of the solution approach",
-            "key_concepts": ["concept1", "concept2", "concept3"],
-            "tips": ["tip1", "tip2", "tip3"],
-            "difficulty_level": "easy/medium/hard for Class 5",
-            "time_needed": "estimated time in minutes"
-        }}
-        
-        Make sure your language is simple, encouraging, and appropriate for Class 5 students.
-        Use clear mathematical notation and explain any symbols used.
-        """
-        response = model.generate_content(prompt)
+        prompt = PromptFormatter.get_solution_prompt(problem_statement, context)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=STEP_BY_STEP_SOLUTION_SCHEMA
+            )
+        )
         
         if response.text:
             try:
                 # Parse JSON response
-                result = json.loads(response.text.strip())
-                
-                # Validate required fields
-                required_fields = ["final_answer", "solution_steps", "explanation"]
-                for field in required_fields:
-                    if field not in result:
-                        logger.warning(f"Missing field {field} in solution response")
-                        result[field] = get_solution_default_value(field)
-                
-                # Ensure solution_steps is a list
-                if not isinstance(result["solution_steps"], list):
-                    result["solution_steps"] = []
+                result = normalize_solution(load_solution(response.text))
                 
                 logger.info(f"Successfully generated solution with {len(result['solution_steps'])} steps")
                 return result
                 
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 logger.error(f"Could not parse JSON response: {e}")
                 return create_fallback_solution(problem_statement, response.text)
         else:
@@ -103,23 +104,44 @@ def solve_problem(problem_statement: str, api_key: str, context: str = "") -> Di
         logger.error(f"Error in problem solving: {str(e)}")
         return create_fallback_solution(problem_statement)
 
+def load_solution(text: str) -> Dict[str, Any]:
+    """
+    Parse a solution JSON response
+    
+    Args:
+        text (str): Raw response text
+    
+    Returns:
+        Dict[str, Any]: Parsed solution
+    
+    Raises:
+        ValueError: If the response is not valid JSON
+    """
+    # orjson.JSONDecodeError is a ValueError
+    return orjson.loads(text)
+
+def normalize_solution(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill missing required solution fields and make sure solution_steps is a list"""
+    required_fields = ["final_answer", "solution_steps", "explanation"]
+    for field in required_fields:
+        if field not in result:
+            logger.warning(f"Missing field {field} in solution response")
+            result[field] = get_solution_default_value(field)
+    
+    if not isinstance(result["solution_steps"], list):
+        result["solution_steps"] = []
+    
+    return result
+
 def get_solution_default_value(field: str) -> Any:
     """Get default value for missing solution fields"""
-    defaults = {
-        "final_answer": "Unable to determine",
-        "solution_steps": [],
-        "explanation": "Unable to provide detailed solution due to technical issues.",
-        "key_concepts": ["Basic arithmetic"],
-        "tips": ["Practice similar problems"],
-        "difficulty_level": "medium",
-        "time_needed": "5-10 minutes"
-    }
-    return defaults.get(field, "Unknown")
+    # Copy list defaults so a filled-in solution never shares them
+    return copy.copy(_SOLUTION_DEFAULTS.get(field, "Unknown"))
 
 def create_fallback_solution(problem_statement: str, raw_response: str = "") -> Dict[str, Any]:
     """Create a fallback solution when JSON parsing fails"""
     return {
-        "final_answer": "Unable to solve automatically",
+        "final_answer": _FALLBACK_FINAL_ANSWER,
         "solution_steps": [
             {
                 "step_number": 1,
@@ -135,7 +157,8 @@ def create_fallback_solution(problem_statement: str, raw_response: str = "") ->
         "time_needed": "varies"
     }
 
-def solve_with_multiple_methods(problem_statement: str, api_key: str, context: str = "") -> Dict[str, Any]:
+@with_gemini()
+def solve_with_multiple_methods(problem_statement: str, api_key: str, context: str = "", model: Optional[genai.GenerativeModel] = None) -> Dict[str, Any]:
     """
     Solve problem using multiple methods when possible
     
@@ -143,108 +166,74 @@ def solve_with_multiple_methods(problem_statement: str, api_key: str, context: s
         problem_statement (str): The math problem
         context (str): Relevant context from RAG system
         api_key (str, optional): Google API key
+        model (genai.GenerativeModel): Shared model, injected by with_gemini
     
     Returns:
         Dict[str, Any]: Solution with multiple methods
     """
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        
-        prompt = f"""
-        You are a Class 5 mathematics tutor. Solve this problem and if possible, show 2-3 different methods.
-        
-        PROBLEM: {problem_statement}
-        CONTEXT: {context if context else "No additional context"}
+        prompt = PromptFormatter.get_multiple_methods_prompt(problem_statement, context)
         
-        Return a JSON response with:
-        {{
-            "primary_solution": {{
-                "method_name": "name of the method",
-                "final_answer": "the answer",
-                "steps": ["step1", "step2", "step3"],
-                "explanation": "why this method works"
-            }},
-            "alternative_methods": [
-                {{
-                    "method_name": "alternative method name",
-                    "final_answer": "same answer", 
-                    "steps": ["step1", "step2"],
-                    "explanation": "why this method also works"
-                }}
-            ],
-            "which_method_is_easier": "explanation of which method is easier for Class 5 students"
-        }}
-        
-        If only one method is suitable for Class 5, just provide the primary_solution and leave alternative_methods empty.
-        """
-        
-        response = model.generate_content(prompt)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(response_mime_type="application/json")
+        )
         
         if response.text:
             try:
-                result = json.loads(response.text.strip())
+                result = orjson.loads(response.text)
                 logger.info("Successfully generated solution with multiple methods")
                 return result
-            except json.JSONDecodeError:
-                # Fall back to single method
-                return solve_problem(problem_statement, context, api_key)
+            except orjson.JSONDecodeError as e:
+                logger.error(f"Could not parse JSON response: {e}")
+                return create_fallback_solution(problem_statement, response.text)
         else:
-            return solve_problem(problem_statement, context, api_key)
+            return create_fallback_solution(problem_statement)
             
     except Exception as e:
         logger.error(f"Error in multi-method solving: {str(e)}")
-        return solve_problem(problem_statement, context, api_key)
+        return create_fallback_solution(problem_statement)
 
-def validate_problem_type(problem_statement: str, api_key: str) -> Dict[str, Any]:
+@semantic_cache(
+    _analysis_cache,
+    key_fn=lambda problem_statement, api_key: problem_statement,
+    should_cache=lambda analysis: analysis.get("problem_type") != "unknown"
+)
+@with_gemini()
+def validate_problem_type(problem_statement: str, api_key: str, model: Optional[genai.GenerativeModel] = None) -> Dict[str, Any]:
     """
     Analyze and categorize the type of math problem
     
     Args:
         problem_statement (str): The math problem
         api_key (str, optional): Google API key
+        model (genai.GenerativeModel): Shared model, injected by with_gemini
     
     Returns:
         Dict[str, Any]: Problem analysis
     """
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        
-        prompt = f"""
-        Analyze this Class 5 math problem and categorize it.
-        
-        PROBLEM: {problem_statement}
-        
-        Return JSON with:
-        {{
-            "problem_type": "addition/subtraction/multiplication/division/word_problem/geometry/fractions/other",
-            "difficulty": "easy/medium/hard for Class 5",
-            "estimated_time": "time in minutes",
-            "required_concepts": ["list", "of", "concepts"],
-            "is_word_problem": boolean,
-            "operations_needed": ["list", "of", "operations"]
-        }}
-        """
-        pdb.set_trace()
-        response = model.generate_content(prompt)
+        prompt = PromptFormatter.get_problem_type_prompt(problem_statement)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=PROBLEM_ANALYSIS_SCHEMA
+            )
+        )
         
         if response.text:
             try:
-                result = json.loads(response.text.strip())
+                # Parses and validates in one pass; ValidationError is a ValueError
+                result = ProblemAnalysis.model_validate_json(response.text).model_dump()
                 return result
-            except json.JSONDecodeError:
+            except ValueError:
                 pass
         
         # Fallback analysis
-        return {
-            "problem_type": "unknown",
-            "difficulty": "medium",
-            "estimated_time": "5-10 minutes",
-            "required_concepts": ["arithmetic"],
-            "is_word_problem": len(problem_statement.split()) > 10,
-            "operations_needed": ["unknown"]
-        }
+        return create_fallback_analysis(problem_statement)
         
     except Exception as e:
         logger.error(f"Error in problem type validation: {str(e)}")
@@ -257,6 +246,17 @@ def validate_problem_type(problem_statement: str, api_key: str) -> Dict[str, Any
             "operations_needed": ["unknown"]
         }
 
+def create_fallback_analysis(problem_statement: str) -> Dict[str, Any]:
+    """Create a fallback problem analysis when the model response is unusable"""
+    return {
+        "problem_type": "unknown",
+        "difficulty": "medium",
+        "estimated_time": "5-10 minutes",
+        "required_concepts": ["arithmetic"],
+        "is_word_problem": len(problem_statement.split()) > 10,
+        "operations_needed": ["unknown"]
+    }
+
 def create_step_by_step_solution(problem_statement: str, api_key: str, context: str = "") -> Dict[str, Any]:
     """
     Create a comprehensive step-by-step solution with problem analysis
@@ -269,69 +269,77 @@ def create_step_by_step_solution(problem_statement: str, api_key: str, context:
     Returns:
         Dict[str, Any]: Complete solution package
     """
-    pdb.set_trace()
-    # Analyze problem type first
-    problem_analysis = validate_problem_type(problem_statement, api_key)
+    return run_coroutine(create_step_by_step_solution_async(problem_statement, api_key, context))
+
+async def create_step_by_step_solution_async(problem_statement: str, api_key: str, context: str = "") -> Dict[str, Any]:
+    """
+    Create a comprehensive step-by-step solution, running the problem
+    analysis, solution and learning objectives requests concurrently
     
-    # Generate solution
-    solution = solve_problem(problem_statement, context, api_key)
+    Args:
+        problem_statement (str): The math problem
+        api_key (str): Google API key
+        context (str): Relevant context from RAG system
+
+    Returns:
+        Dict[str, Any]: Complete solution package
+    """
+    problem_analysis, solution, learning_objectives = await asyncio.gather(
+        asyncio.to_thread(validate_problem_type, problem_statement, api_key),
+        asyncio.to_thread(solve_problem, problem_statement, api_key, context),
+        asyncio.to_thread(extract_learning_objectives, problem_statement, api_key)
+    )
     
     # Combine results
     complete_solution = {
         "problem_analysis": problem_analysis,
         "solution": solution,
-        "learning_objectives": extract_learning_objectives(problem_statement, api_key)
+        "learning_objectives": learning_objectives
     }
     
     return complete_solution
 
-def extract_learning_objectives(problem_statement: str, api_key: Optional[str] = None) -> List[str]:
+@semantic_cache(
+    _objectives_cache,
+    key_fn=lambda problem_statement, api_key=None: problem_statement,
+    should_cache=lambda objectives: tuple(objectives) not in (_FALLBACK_OBJECTIVES, _ERROR_OBJECTIVES)
+)
+@with_gemini()
+def extract_learning_objectives(problem_statement: str, api_key: Optional[str] = None, model: Optional[genai.GenerativeModel] = None) -> List[str]:
     """
     Extract learning objectives from the problem
     
     Args:
         problem_statement (str): The math problem
         api_key (str, optional): Google API key
+        model (genai.GenerativeModel): Shared model, injected by with_gemini
     
     Returns:
         List[str]: Learning objectives
     """
     try:
-        if api_key:
-            genai.configure(api_key=api_key)
-        elif os.getenv("GOOGLE_API_KEY"):
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        else:
-            return ["Practice problem solving skills"]
-        
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        
-        prompt = f"""
-        What are the key learning objectives for a Class 5 student solving this problem?
-        
-        PROBLEM: {problem_statement}
-        
-        Return a JSON array of 3-5 specific learning objectives:
-        ["objective1", "objective2", "objective3"]
-        """
+        prompt = PromptFormatter.get_learning_objectives_prompt(problem_statement)
         
-        response = model.generate_content(prompt)
+        response = generate_content(
+            model,
+            prompt.text,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=STRING_LIST_SCHEMA
+            )
+        )
         
         if response.text:
             try:
-                objectives = json.loads(response.text.strip())
+                objectives = orjson.loads(response.text)
                 if isinstance(objectives, list):
                     return objectives
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
         
         # Fallback objectives
-        return [
-            "Practice arithmetic operations",
-            "Develop problem-solving skills", 
-            "Apply mathematical concepts to real situations"
-        ]
+        return list(_FALLBACK_OBJECTIVES)
         
     except Exception as e:
         logger.error(f"Error extracting learning objectives: {str(e)}")
-        return ["Practice mathematical thinking"]
+        return list(_ERROR_OBJECTIVES)
@@ -2,13 +2,39 @@
 Simple API key test for Gemini
 """
 import os
+import pytest
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def test_api_key():
-    """Test if the Gemini API key is configured and working"""
+# A short reply is enough to prove the key works. No max_output_tokens cap:
+# on 2.5 models thinking tokens count toward it, and a low cap can end the
+# response before any text. The timeout stops a hung request from stalling
+# the run while leaving room for thinking.
+PING_PROMPT = "Hello, this is a test. Please respond with 'API working'"
+PING_OPTIONS = {
+    "generation_config": {"temperature": 0.2},
+    "request_options": {"timeout": 60}
+}
+
+requires_api_key = pytest.mark.skipif(not os.getenv("GOOGLE_API_KEY"), reason="GOOGLE_API_KEY not set")
+
+@pytest.fixture(scope="session")
+def gemini_model():
+    """Configured Gemini model shared by every test in the session"""
+    from app.study_agent.gemini_utils import ensure_configured, get_model
+    ensure_configured(os.getenv("GOOGLE_API_KEY"))
+    return get_model()
+
+@requires_api_key
+def test_api_key(gemini_model):
+    """Test that Gemini answers a simple prompt"""
+    response = gemini_model.generate_content(PING_PROMPT, **PING_OPTIONS)
+    assert response.text.strip()
+
+def check_api_key() -> bool:
+    """Check if the Gemini API key is configured and working, printing each step"""
     print("🔑 Testing Gemini API Key Configuration")
     print("=" * 40)
     
@@ -24,19 +50,19 @@ def test_api_key():
     
     try:
         # Test basic import
-        import google.generativeai as genai
+        from app.study_agent.gemini_utils import DEFAULT_MODEL, ensure_configured, get_model
         print("✅ google.generativeai module imported successfully")
         
         # Configure API
-        genai.configure(api_key=api_key)
+        ensure_configured(api_key)
         print("✅ API key configured successfully")
         
-        # Test model initialization
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        print("✅ Gemini Pro 1.5 model initialized successfully")
+        # Test model initialization (shared instance, reused by later calls)
+        model = get_model()
+        print(f"✅ {DEFAULT_MODEL} model initialized successfully")
         
         # Test simple generation
-        response = model.generate_content("Hello, this is a test. Please respond with 'API working'")
+        response = model.generate_content(PING_PROMPT, **PING_OPTIONS)
         
         if response.text:
             print(f"✅ API test successful. Response: {response.text.strip()}")
@@ -50,7 +76,7 @@ def test_api_key():
         return False
 
 if __name__ == "__main__":
-    success = test_api_key()
+    success = check_api_key()
     if success:
         print("\n🎉 Gemini API is working correctly!")
         print("You can now use the Educational Tutor System")
@@ -0,0 +1,78 @@
+"""
+Offline tests for the Gemini response cache
+"""
+import numpy as np
+from app.study_agent.llm_cache import SemanticCache, bucket_key, normalize_text, semantic_cache
+
+def same_vector(text: str) -> np.ndarray:
+    """Embed every text identically, so any bucket-mate is a semantic hit"""
+    return np.full(4, 0.5, dtype=np.float32)
+
+def test_bucket_key_separates_operators():
+    assert bucket_key("8 + 6") != bucket_key("8 − 6")
+    assert bucket_key("8 × 6") != bucket_key("8 ÷ 6")
+    assert bucket_key("what is 8 plus 6") != bucket_key("what is 8 minus 6")
+
+def test_bucket_key_ignores_rewording():
+    assert bucket_key(normalize_text("What is 8 + 6?")) == bucket_key(normalize_text("Calculate  8 + 6"))
+
+def test_bucket_key_keeps_fractions_whole():
+    _, numbers, operators = bucket_key("3/4 + 1/4")
+    assert numbers == ("3/4", "1/4")
+    assert operators == ("+",)
+
+def test_bucket_key_separates_scopes():
+    assert bucket_key("8 + 6", "chapter 1") != bucket_key("8 + 6", "chapter 2")
+
+def test_exact_hit():
+    cache = SemanticCache(embed_fn=None)
+    cache.set("what is 8 + 6?", {"final_answer": "14"})
+    assert cache.get("what is 8 + 6?") == ({"final_answer": "14"}, None)
+    assert cache.get("what is 8 + 6?", scope="other") == (None, None)
+
+def test_semantic_hit_within_bucket_only():
+    cache = SemanticCache(embed_fn=same_vector)
+    cache.set("what is 8 + 6?", "14")
+    value, _ = cache.get("calculate 8 + 6")
+    assert value == "14"
+    value, _ = cache.get("calculate 8 - 6")
+    assert value is None
+
+def test_exact_only_cache_has_no_semantic_tier():
+    cache = SemanticCache(embed_fn=None)
+    cache.set("what is 8 + 6?", "14")
+    assert cache.get("calculate 8 + 6") == (None, None)
+
+def test_evicted_entries_are_not_semantic_hits():
+    cache = SemanticCache(maxsize=1, embed_fn=same_vector)
+    cache.set("what is 8 + 6?", "14")
+    cache.set("what is 9 + 9?", "18")
+    value, _ = cache.get("calculate 8 + 6")
+    assert value is None
+
+def test_semantic_entries_are_swept():
+    cache = SemanticCache(maxsize=2, embed_fn=same_vector)
+    for n in range(10):
+        cache.set(f"what is {n} + 1?", n + 1)
+    assert cache._semantic_size <= 2 * cache.maxsize
+
+def test_decorator_caches_copies_and_skips_fallbacks():
+    calls = []
+
+    @semantic_cache(
+        SemanticCache(embed_fn=None),
+        key_fn=lambda problem: problem,
+        should_cache=lambda result: result["answer"] is not None
+    )
+    def solve(problem):
+        calls.append(problem)
+        return {"answer": None if "?" in problem else len(problem)}
+
+    first = solve("8 + 6")
+    first["answer"] = "mutated"
+    assert solve("8  +  6") == {"answer": 5}
+    assert len(calls) == 1
+
+    solve("8 + 6?")
+    solve("8 + 6?")
+    assert len(calls) == 3
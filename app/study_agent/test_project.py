@@ -2,20 +2,18 @@
 Quick test script for your Educational AI Tutor System
 """
 import os
-from main import EducationalTutorSystem
+import pytest
+from app.study_agent.main import EducationalTutorSystem
 
+@pytest.mark.skipif(not os.getenv("GOOGLE_API_KEY"), reason="GOOGLE_API_KEY not set")
 def test_system():
     print("🎓 Testing Educational AI Tutor System")
     print("=" * 50)
     
     # Initialize system
-    try:
-        #data/ncert_v_math/eemm102.pdf
-        system = EducationalTutorSystem(api_key=None, board="NCERT", class_name="Class 5", subject="Mathematics")
-        print("✅ System initialized successfully!")
-    except Exception as e:
-        print(f"❌ System initialization failed: {e}")
-        return
+    #data/ncert_v_math/eemm102.pdf
+    system = EducationalTutorSystem(api_key=None, board="NCERT", class_name="Class 5", subject="Mathematics")
+    print("✅ System initialized successfully!")
     
     # Validate system
     print("\n🔍 Validating system...")
@@ -37,6 +35,7 @@ def test_system():
         print("\n📊 AI Solution Result:")
         import json
         print(json.dumps(result, indent=2, ensure_ascii=False))
+        assert result.get("intent") != "error"
         
         # Also test evaluation mode
         print(f"\n🔍 Testing Evaluation Mode...")
@@ -45,6 +44,7 @@ def test_system():
         
         print("\n📊 AI Evaluation Result:")
         print(json.dumps(result2, indent=2, ensure_ascii=False))
+        assert result2.get("intent") != "error"
         
     else:
         print(f"\n⚠️ Image not found at {image_path}")
@@ -0,0 +1,49 @@
+"""
+Offline tests for prompt template specialization and formatting
+"""
+import pytest
+from app.study_agent.prompts import (
+    MAX_INTERNED_CONTEXT,
+    PromptFormatter,
+    PromptTemplates,
+    _NO_CONTEXT,
+    _intern_context,
+)
+
+PROBLEM = "What is 25 + 17?"
+
+def test_specialized_similar_prompt_matches_generic_template():
+    prompt = PromptFormatter.get_similar_questions_prompt(PROBLEM, "Addition chapter", 3)
+    generic = PromptTemplates.SIMILAR_QUESTIONS_GENERATION.format(
+        problem_statement=PROBLEM, context="Addition chapter", num_questions=3
+    )
+    assert prompt.text == generic
+
+def test_unspecialized_count_falls_back_to_generic_template():
+    prompt = PromptFormatter.get_progressive_questions_prompt(PROBLEM, 4)
+    assert prompt.text == PromptTemplates.PROGRESSIVE_QUESTIONS.format(problem_statement=PROBLEM, num_questions=4)
+
+def test_themed_prompt_for_known_and_unknown_themes():
+    known = PromptFormatter.get_themed_questions_prompt(PROBLEM, " Animals ", 3)
+    assert known.text == PromptTemplates.THEMED_QUESTIONS.format(problem_statement=PROBLEM, theme="animals", num_questions=3)
+    unknown = PromptFormatter.get_themed_questions_prompt(PROBLEM, "dinosaurs", 3)
+    assert "dinosaurs" in unknown.text
+
+def test_format_prompt_reuses_instances():
+    first = PromptFormatter.get_learning_objectives_prompt(PROBLEM)
+    assert PromptFormatter.get_learning_objectives_prompt(PROBLEM) is first
+
+def test_format_prompt_accepts_unhashable_values():
+    prompt = PromptFormatter.format_prompt("Context: {context}", context=["chunk 1", "chunk 2"])
+    assert prompt.text == "Context: ['chunk 1', 'chunk 2']"
+
+def test_format_prompt_reports_missing_parameters():
+    with pytest.raises(ValueError, match="problem_statement"):
+        PromptFormatter.format_prompt(PromptTemplates.LEARNING_OBJECTIVES)
+
+def test_intern_context_only_short_strings():
+    assert _intern_context("") is _NO_CONTEXT
+    short = "".join(["Chapter ", "2"])
+    assert _intern_context(short) is _intern_context("Chapter 2")
+    long = "x" * (MAX_INTERNED_CONTEXT + 1)
+    assert _intern_context(long) is long
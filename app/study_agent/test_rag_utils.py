@@ -0,0 +1,37 @@
+"""
+Offline tests for near-duplicate chunk detection in rag_utils
+"""
+from app.study_agent.rag_utils import RAGManager, _SimHashIndex, _simhash
+
+BASE = 0x0123456789ABCDEF
+
+def test_simhash_is_stable_and_case_insensitive():
+    text = "A box has 4 rows of 7 chocolates. How many chocolates in total?"
+    assert _simhash(text) == _simhash(text.upper())
+    assert 0 <= _simhash(text) < 1 << 64
+
+def test_simhash_near_duplicates_are_close():
+    text = " ".join(f"word{i}" for i in range(200))
+    changed = text.replace("word100", "other100")
+    assert bin(_simhash(text) ^ _simhash(changed)).count("1") <= 16
+
+def test_index_skips_fingerprints_within_three_bits():
+    index = _SimHashIndex(RAGManager.SIMHASH_MAX_DISTANCE)
+    assert index.add_if_new(BASE)
+    # Three flipped bits in one band
+    assert not index.add_if_new(BASE ^ 0b111)
+    # Three flipped bits in three different bands; the fourth band still matches
+    assert not index.add_if_new(BASE ^ (1 | 1 << 16 | 1 << 32))
+
+def test_index_keeps_fingerprints_four_bits_apart():
+    index = _SimHashIndex(RAGManager.SIMHASH_MAX_DISTANCE)
+    assert index.add_if_new(BASE)
+    assert index.add_if_new(BASE ^ 0b1111)
+    assert index.add_if_new(BASE ^ (1 | 1 << 16 | 1 << 32 | 1 << 48))
+
+def test_index_compares_against_every_added_fingerprint():
+    index = _SimHashIndex(RAGManager.SIMHASH_MAX_DISTANCE)
+    assert index.add_if_new(BASE)
+    far = BASE ^ (0xFFFF << 48) ^ 0xFFFF
+    assert index.add_if_new(far)
+    assert not index.add_if_new(far ^ 1 << 20)
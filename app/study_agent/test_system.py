@@ -3,83 +3,113 @@ Sample test script for the Educational AI Tutor System
 """
 import os
 import json
-from main import EducationalTutorSystem
+import asyncio
+import pytest
+from app.study_agent.main import EducationalTutorSystem
 
-def test_system_components():
-    """Test individual system components"""
+requires_api_key = pytest.mark.skipif(not os.getenv("GOOGLE_API_KEY"), reason="GOOGLE_API_KEY not set")
+
+def test_ocr_module():
+    """OCR utility imports"""
+    from app.study_agent.ocr_utils import extract_text_from_image
+    # Note: This would need an actual image file to test
+    print("✅ OCR module loaded successfully")
+
+@requires_api_key
+def test_intent_detection():
+    """Intent detection on a problem with a worked answer"""
+    from app.study_agent.intent_utils import detect_intent
+    test_text = "What is 25 + 17? My answer: 25 + 17 = 42"
+    intent = detect_intent(test_text, "Check my answer")
+    print(f"✅ Intent detected: {intent}")
+    assert intent in ("evaluation", "solve")
+
+@requires_api_key
+def test_evaluation():
+    """Evaluation of a student's solution"""
+    from app.study_agent.evaluation_utils import evaluate_solution
+    eval_result = evaluate_solution(
+        "What is 25 + 17?",
+        "25 + 17 = 42",
+        ""
+    )
+    print(f"✅ Evaluation completed. Score: {eval_result.get('score', 'N/A')}")
+    assert "score" in eval_result
+
+@requires_api_key
+def test_solution_generation():
+    """Step-by-step solution generation"""
+    from app.study_agent.solve_utils import solve_problem
+    solution = solve_problem("What is 8 × 6?", "")
+    print(f"✅ Solution generated: {solution.get('final_answer', 'N/A')}")
+    assert solution.get("final_answer")
+
+@requires_api_key
+def test_similar_questions():
+    """Similar question generation"""
+    from app.study_agent.similar_question_utils import generate_similar_questions
+    questions = generate_similar_questions("What is 25 + 17?", "", 3)
+    print(f"✅ Generated {len(questions)} similar questions")
+    # The model may return fewer questions than asked; never more
+    assert 1 <= len(questions) <= 3
+    assert all(isinstance(question, str) and question for question in questions)
+
+COMPONENT_TESTS = {
+    "📸 OCR extraction": test_ocr_module,
+    "🤔 Intent detection": test_intent_detection,
+    "📊 Evaluation": test_evaluation,
+    "🔧 Solution generation": test_solution_generation,
+    "❓ Similar questions": test_similar_questions,
+}
+
+async def run_component_tests():
+    """Run the component tests concurrently when used as a script"""
     print("🧪 Testing System Components")
     print("=" * 40)
     
-    try:
-        # Test OCR utility
-        print("📸 Testing OCR extraction...")
-        from ocr_utils import extract_text_from_image
-        # Note: This would need an actual image file to test
-        print("✅ OCR module loaded successfully")
-        
-        # Test Intent Detection
-        print("🤔 Testing intent detection...")
-        from intent_utils import detect_intent
-        test_text = "What is 25 + 17? My answer: 25 + 17 = 42"
-        intent = detect_intent(test_text, "Check my answer")
-        print(f"✅ Intent detected: {intent}")
-        
-        # Test Evaluation
-        print("📊 Testing evaluation...")
-        from evaluation_utils import evaluate_solution
-        eval_result = evaluate_solution(
-            "What is 25 + 17?",
-            "25 + 17 = 42",
-            ""
-        )
-        print(f"✅ Evaluation completed. Score: {eval_result.get('score', 'N/A')}")
-        
-        # Test Solution Generation
-        print("🔧 Testing solution generation...")
-        from solve_utils import solve_problem
-        solution = solve_problem("What is 8 × 6?", "")
-        print(f"✅ Solution generated: {solution.get('final_answer', 'N/A')}")
-        
-        # Test Similar Questions
-        print("❓ Testing similar questions...")
-        from similar_question_utils import generate_similar_questions
-        questions = generate_similar_questions("What is 25 + 17?", "", 3)
-        print(f"✅ Generated {len(questions)} similar questions")
-        
+    # The checks are independent Gemini round-trips, so run them side by
+    # side; wall time is the slowest check rather than the sum
+    results = await asyncio.gather(
+        *(asyncio.to_thread(test) for test in COMPONENT_TESTS.values()),
+        return_exceptions=True
+    )
+    
+    failed = False
+    for name, result in zip(COMPONENT_TESTS, results):
+        if isinstance(result, BaseException):
+            failed = True
+            print(f"❌ {name} failed: {result!r}")
+    
+    if not failed:
         print("\n🎉 All component tests passed!")
-        
-    except Exception as e:
-        print(f"❌ Component test failed: {e}")
 
+@requires_api_key
 def test_full_system():
     """Test the complete system with sample data"""
     print("\n🎓 Testing Complete Educational Tutor System")
     print("=" * 50)
     
-    try:
-        # Initialize system (without PDF for testing)
-        print("🚀 Initializing system...")
-        system = EducationalTutorSystem()
-        
-        # Check system status
-        print("🔍 Checking system status...")
-        info = system.get_system_info()
-        print(f"System Status: {info['system_status']}")
-        
-        # Validate system
-        print("✅ Validating system components...")
-        validation = system.validate_system()
-        for component, status in validation.items():
-            status_str = "✅ PASS" if status else "❌ FAIL" 
-            print(f"  {component}: {status_str}")
-        
-        print("\n🎯 System initialization completed!")
-        
-        # Note: To test image processing, you would need:
-        # result = system.process_math_problem("path/to/image.jpg", "Check my answer")
-        
-    except Exception as e:
-        print(f"❌ System test failed: {e}")
+    # Initialize system (without PDF for testing)
+    print("🚀 Initializing system...")
+    system = EducationalTutorSystem(api_key=None, board="NCERT", class_name="Class 5", subject="Mathematics")
+    
+    # Check system status
+    print("🔍 Checking system status...")
+    info = system.get_system_info()
+    print(f"System Status: {info['system_status']}")
+    
+    # Validate system
+    print("✅ Validating system components...")
+    validation = system.validate_system()
+    for component, status in validation.items():
+        status_str = "✅ PASS" if status else "❌ FAIL" 
+        print(f"  {component}: {status_str}")
+    assert validation["agent_initialized"]
+    
+    print("\n🎯 System initialization completed!")
+    
+    # Note: To test image processing, you would need:
+    # result = system.process_math_problem("path/to/image.jpg", "Check my answer")
 
 def create_sample_pdf_placeholder():
     """Create a placeholder for the PDF file"""
@@ -162,10 +192,13 @@ def main():
     create_sample_pdf_placeholder()
     
     # Run component tests
-    test_system_components()
+    asyncio.run(run_component_tests())
     
     # Run full system test
-    test_full_system()
+    try:
+        test_full_system()
+    except Exception as e:
+        print(f"❌ System test failed: {e!r}")
     
     # Show expected output examples
     demonstrate_expected_output()
@@ -1,13 +1,53 @@
+import hashlib
+import time
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.security import verify_token
+from app.models.user import UserResponse
 from app.utils.database import get_database, get_object_id, serialize_object_id
 
 security = HTTPBearer()
 
+# Only the profile fields routes read; leaves the password hash and any
+# other large fields in the database
+_USER_PROJECTION = {field: 1 for field in UserResponse.model_fields if field != "id"}
+_USER_PROJECTION["token_version"] = 1
+
+# Authenticated users by token digest, so repeat requests skip the JWT
+# verify and the users lookup. Entries also expire with the token itself.
+# Only touched from the event loop with no await in between, so no lock.
+AUTH_CACHE_TTL = 30
+_auth_cache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+
+# Current token_version per user id, so claims-only auth can still reject
+# revoked tokens with at most one small read per user per TTL
+_token_versions = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+
+def _token_digest(token: str) -> bytes:
+    """Hash a token so the cache never holds the raw credential."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def invalidate_cached_user(user_id: str):
+    """Drop cached sessions of a user whose record changed."""
+    _token_versions.pop(user_id, None)
+    for key, (_, user) in list(_auth_cache.items()):
+        if user["id"] == user_id:
+            _auth_cache.pop(key, None)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Get current authenticated user."""
     token = credentials.credentials
+    digest = _token_digest(token)
+    
+    cached = _auth_cache.get(digest)
+    if cached is not None:
+        expires_at, user = cached
+        if time.time() < expires_at:
+            # Routes may modify the dict they get
+            return dict(user)
+        _auth_cache.pop(digest, None)
+    
     payload = verify_token(token)
     
     user_id = payload.get("sub")
@@ -17,13 +57,59 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Could not validate credentials"
         )
     
-    # Get user from database
+    # Get user from database. Read from the primary: a lagging secondary could
+    # miss a fresh registration or a logout's token_version bump; repeat
+    # requests are served from _auth_cache anyway
     db = get_database()
-    user = await db.users.find_one({"_id": get_object_id(user_id)})
+    user = await db.users.find_one({"_id": get_object_id(user_id)}, projection=_USER_PROJECTION)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
-    return serialize_object_id(user)
+    # Logout bumps token_version, revoking every token issued before it
+    token_version = user.pop("token_version", 0)
+    _token_versions[user_id] = token_version
+    if payload.get("ver", 0) != token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session has been revoked"
+        )
+    
+    user = serialize_object_id(user)
+    _auth_cache[digest] = (payload.get("exp", 0), user)
+    return dict(user)
+
+async def _current_token_version(user_id: str):
+    """Get a user's token_version, cached briefly; None if the user doesn't exist."""
+    if user_id in _token_versions:
+        return _token_versions[user_id]
+    db = get_database()
+    user = await db.users.find_one({"_id": get_object_id(user_id)}, projection={"token_version": 1})
+    if user is None:
+        return None
+    _token_versions[user_id] = user.get("token_version", 0)
+    return _token_versions[user_id]
+
+async def get_current_user_light(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get the current user's id, email and role from the token claims alone."""
+    payload = verify_token(credentials.credentials)
+    if payload.get("sub") is None or "email" not in payload:
+        # Tokens issued before the claims were added
+        return await get_current_user(credentials)
+    
+    # The profile comes from the claims; only the revocation check reads the
+    # database, and that read is shared by all of a user's requests for the TTL
+    token_version = await _current_token_version(payload["sub"])
+    if token_version is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    if payload.get("ver", 0) != token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session has been revoked"
+        )
+    return {"id": payload["sub"], "email": payload["email"], "role": payload.get("role", "user")}
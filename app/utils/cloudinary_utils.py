@@ -1,41 +1,104 @@
-import cloudinary
-import cloudinary.uploader
+import asyncio
+import functools
 from fastapi import UploadFile, HTTPException
-from PIL import Image
-import io
+import tempfile
+from typing import Optional
 from app.core.config import settings
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.cloudinary_cloud_name,
-    api_key=settings.cloudinary_api_key,
-    api_secret=settings.cloudinary_api_secret
-)
+# Bytes per request for chunked uploads
+UPLOAD_CHUNK_SIZE = 6_000_000
+# Uploads are read in blocks of this size and spill to disk past SPOOL_MAX_SIZE
+READ_BLOCK_SIZE = 1 << 20
+SPOOL_MAX_SIZE = 8 << 20
+# Images are uploaded as-is and resized by Cloudinary; this only caps the upload
+MAX_IMAGE_BYTES = 25 << 20
+
+# Derived images Cloudinary generates in the background after upload: the
+# display-size image served as "url", and a card thumbnail
+DISPLAY_TRANSFORMATION = {"width": 1920, "height": 1080, "crop": "limit", "quality": "auto", "fetch_format": "auto"}
+THUMBNAIL_TRANSFORMATION = {"width": 600, "height": 400, "crop": "fill", "quality": "auto", "fetch_format": "auto"}
+
+@functools.cache
+def _cloudinary():
+    """Import and configure the Cloudinary SDK on first use; returns its uploader."""
+    import cloudinary
+    import cloudinary.uploader
+    cloudinary.config(
+        cloud_name=settings.cloudinary_cloud_name,
+        api_key=settings.cloudinary_api_key,
+        api_secret=settings.cloudinary_api_secret
+    )
+    return cloudinary.uploader
+
+def _require_content_type(file: UploadFile, prefix: str, detail: str):
+    """Reject an upload whose content type doesn't start with prefix."""
+    if not (file.content_type or "").startswith(prefix):
+        raise HTTPException(status_code=400, detail=detail)
+
+async def _do_upload(payload, **options) -> dict:
+    """Chunked upload in a worker thread, since the SDK call is blocking."""
+    return await asyncio.to_thread(
+        _cloudinary().upload_large, payload, chunk_size=UPLOAD_CHUNK_SIZE, **options
+    )
+
+def _derived_url(result: dict, index: int, transformation: dict) -> str:
+    """URL of an eager derivative, built locally while async generation is pending."""
+    eager = result.get("eager") or ()
+    if len(eager) > index and eager[index].get("secure_url"):
+        return eager[index]["secure_url"]
+    _cloudinary()
+    from cloudinary.utils import cloudinary_url
+    return cloudinary_url(result["public_id"], secure=True, **transformation)[0]
+
+async def _destroy(public_id: str, **options) -> bool:
+    """Delete an asset in a worker thread; True if Cloudinary removed it."""
+    try:
+        result = await asyncio.to_thread(_cloudinary().destroy, public_id, **options)
+        return result.get("result") == "ok"
+    except Exception:
+        return False
+
+async def _spool_upload(file: UploadFile, max_bytes: Optional[int] = None) -> tempfile.SpooledTemporaryFile:
+    """Copy an upload into a spooled temp file so large files never sit fully in memory."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    size = 0
+    while chunk := await file.read(READ_BLOCK_SIZE):
+        size += len(chunk)
+        # Stop as soon as the limit is passed instead of spooling the rest
+        if max_bytes is not None and size > max_bytes:
+            spool.close()
+            raise HTTPException(status_code=413, detail="File is too large")
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
 
 async def upload_image_to_cloudinary(file: UploadFile, folder: str = "personal_tutor") -> dict:
     """Upload image to Cloudinary and return URL and public_id."""
+    # Validate file type
+    _require_content_type(file, "image/", "File must be an image")
+    
     try:
-        # Validate file type
-        if not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image")
-        
-        # Read file content
-        contents = await file.read()
-        
-        # Optimize image before upload
-        optimized_image = optimize_image(contents)
-        
-        # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
-            optimized_image,
-            folder=folder,
-            resource_type="image",
-            quality="auto",
-            fetch_format="auto"
-        )
+        with await _spool_upload(file, max_bytes=MAX_IMAGE_BYTES) as spool:
+            # Upload the original straight from the spool; Cloudinary resizes
+            # and re-encodes it server-side
+            eager_options = {}
+            if settings.cloudinary_eager_notification_url:
+                eager_options["eager_notification_url"] = settings.cloudinary_eager_notification_url
+            result = await _do_upload(
+                spool,
+                folder=folder,
+                resource_type="image",
+                quality="auto",
+                fetch_format="auto",
+                eager=[DISPLAY_TRANSFORMATION, THUMBNAIL_TRANSFORMATION],
+                eager_async=True,
+                **eager_options
+            )
         
         return {
-            "url": result["secure_url"],
+            "url": _derived_url(result, 0, DISPLAY_TRANSFORMATION),
+            "thumbnail_url": _derived_url(result, 1, THUMBNAIL_TRANSFORMATION),
+            "original_url": result["secure_url"],
             "public_id": result["public_id"],
             "width": result["width"],
             "height": result["height"],
@@ -43,59 +106,31 @@ async def upload_image_to_cloudinary(file: UploadFile, folder: str = "personal_t
             "bytes": result["bytes"]
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload image: {str(e)}")
 
 async def delete_image_from_cloudinary(public_id: str) -> bool:
     """Delete image from Cloudinary."""
-    try:
-        result = cloudinary.uploader.destroy(public_id)
-        return result.get("result") == "ok"
-    except Exception:
-        return False
-
-def optimize_image(image_bytes: bytes, max_size: tuple = (1920, 1080), quality: int = 85) -> bytes:
-    """Optimize image size and quality."""
-    try:
-        # Open image
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Convert to RGB if necessary
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
-        
-        # Resize if too large
-        image.thumbnail(max_size, Image.Resampling.LANCZOS)
-        
-        # Save optimized image
-        output = io.BytesIO()
-        image.save(output, format="JPEG", quality=quality, optimize=True)
-        output.seek(0)
-        
-        return output.getvalue()
-    
-    except Exception:
-        # Return original if optimization fails
-        return image_bytes
+    return await _destroy(public_id)
 
 async def upload_pdf_to_cloudinary(file: UploadFile, folder: str = "pdfs") -> dict:
     """Upload PDF to Cloudinary and return URL and public_id."""
+    # Validate file type
+    _require_content_type(file, "application/pdf", "File must be a PDF")
+    
     try:
-        # Validate file type
-        if not file.content_type == "application/pdf":
-            raise HTTPException(status_code=400, detail="File must be a PDF")
-        
-        # Read file content
-        contents = await file.read()
-        
-        # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
-            contents,
-            folder=folder,
-            resource_type="raw",  # Use 'raw' for non-image files like PDFs
-            use_filename=True,
-            unique_filename=False  # Keep original filename
-        )
+        # Upload to Cloudinary straight from the spool
+        with await _spool_upload(file) as spool:
+            result = await _do_upload(
+                spool,
+                filename=file.filename,
+                folder=folder,
+                resource_type="raw",  # Use 'raw' for non-image files like PDFs
+                use_filename=True,
+                unique_filename=False  # Keep original filename
+            )
         
         return {
             "url": result["secure_url"],
@@ -111,8 +146,4 @@ async def upload_pdf_to_cloudinary(file: UploadFile, folder: str = "pdfs") -> di
 
 async def delete_pdf_from_cloudinary(public_id: str) -> bool:
     """Delete PDF from Cloudinary."""
-    try:
-        result = cloudinary.uploader.destroy(public_id, resource_type="raw")
-        return result.get("result") == "ok"
-    except Exception:
-        return False
+    return await _destroy(public_id, resource_type="raw")
@@ -1,63 +1,148 @@
+import asyncio
+import atexit
+import re
+import threading
 import motor.motor_asyncio
+import orjson
 from bson import ObjectId
-from typing import Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from app.core.config import settings
 
-# MongoDB client
-client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url)
-database = client[settings.database_name]
+# MongoDB client per event loop; Motor clients are bound to one loop. A Motor
+# client holds a reference to its loop, so entries are not released on their
+# own: clients of closed loops are closed when the next loop gets its client,
+# and the rest on shutdown via close_database().
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _create_client() -> motor.motor_asyncio.AsyncIOMotorClient:
+    """Create a MongoDB client with the configured pool and wire settings."""
+    return motor.motor_asyncio.AsyncIOMotorClient(
+        settings.mongodb_url,
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        compressors=settings.mongodb_compressors,
+        zlibCompressionLevel=3,
+        retryWrites=True
+    )
+
+def _get_client(loop: asyncio.AbstractEventLoop) -> motor.motor_asyncio.AsyncIOMotorClient:
+    """Get the MongoDB client for an event loop, creating it on first use."""
+    client = _clients.get(loop)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(loop)
+            if client is None:
+                _close_stale_clients()
+                client = _create_client()
+                _clients[loop] = client
+    return client
+
+def _close_stale_clients():
+    """Close and drop the clients of event loops that have been closed; lock held."""
+    for loop in [loop for loop in _clients if loop.is_closed()]:
+        _clients.pop(loop).close()
+
+def close_database():
+    """Close every MongoDB client and its pooled connections."""
+    with _clients_lock:
+        while _clients:
+            _, client = _clients.popitem()
+            client.close()
+
+atexit.register(close_database)
+
+# String form of an ObjectId: 24 hex digits
+_OBJECT_ID_RE = re.compile(r"[0-9a-fA-F]{24}")
 
 def get_database():
-    """Get database instance."""
-    return database
+    """Get database instance for the running event loop."""
+    # Raises RuntimeError outside a loop; every caller is a coroutine
+    return _get_client(asyncio.get_running_loop())[settings.database_name]
 
 def get_object_id(id_str: str) -> ObjectId:
     """Convert string ID to ObjectId."""
-    try:
-        return ObjectId(id_str)
-    except Exception:
+    if isinstance(id_str, ObjectId):
+        return id_str
+    # Validate up front instead of catching bson's exception on bad input
+    if not isinstance(id_str, str) or not _OBJECT_ID_RE.fullmatch(id_str):
         raise ValueError(f"Invalid ObjectId: {id_str}")
+    return ObjectId(id_str)
+
+# Value types serialize_object_id has to convert; everything else passes through
+_CONVERTED_TYPES = frozenset((ObjectId, list))
+
+def _serialize_value(value):
+    """Convert an ObjectId, or ObjectIds in a list, to strings."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, list):
+        return [str(item) if isinstance(item, ObjectId) else item for item in value]
+    return value
 
 def serialize_object_id(obj: dict) -> dict:
     """Convert ObjectId to string in dictionary."""
     if obj is None:
         return None
     
-    if "_id" in obj:
-        obj["id"] = str(obj["_id"])
-        del obj["_id"]
-    
-    # Handle nested ObjectIds
-    for key, value in obj.items():
-        if isinstance(value, ObjectId):
-            obj[key] = str(value)
-        elif isinstance(value, list):
-            obj[key] = [str(item) if isinstance(item, ObjectId) else item for item in value]
-    
-    return obj
+    # Single pass: rename _id to id and stringify ObjectIds into a new dict.
+    # Most fields are plain scalars, so the exact type check skips the helper
+    # call for them.
+    return {
+        ("id" if key == "_id" else key): (
+            value if type(value) not in _CONVERTED_TYPES else _serialize_value(value)
+        )
+        for key, value in obj.items()
+    }
+
+def _oid_default(value):
+    """orjson fallback for BSON types it can't encode natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError
+
+def serialize_deep(obj: dict) -> dict:
+    """Convert ObjectIds at any depth to strings via an orjson round trip; datetimes become ISO strings."""
+    if obj is None:
+        return None
+    result = orjson.loads(orjson.dumps(obj, default=_oid_default))
+    if "_id" in result:
+        result["id"] = result.pop("_id")
+    return result
 
 async def create_indexes():
     """Create database indexes for better performance."""
-    # Users collection
-    await database.users.create_index("email", unique=True)
-    
-    # Notes collection
-    await database.notes.create_index("user_id")
-    await database.notes.create_index("subject")
-    await database.notes.create_index([("user_id", 1), ("subject", 1)])
-    
-    # Questions collection
-    await database.questions.create_index("user_id")
-    await database.questions.create_index("note_id")
-    await database.questions.create_index([("user_id", 1), ("subject", 1)])
-    
-    # Feedback collection
-    await database.feedback.create_index("question_id")
-    
-    # Suggested questions collection
-    await database.suggested_questions.create_index("user_id")
-    await database.suggested_questions.create_index([("user_id", 1), ("is_completed", 1)])
-    
-    # Learning analytics collection
-    await database.learning_analytics.create_index("user_id")
-    await database.learning_analytics.create_index([("user_id", 1), ("subject", 1)])
+    database = get_database()
+    # One createIndexes command per collection, all collections concurrently.
+    # user_id-only queries are served by the prefix of the compound indexes.
+    await asyncio.gather(
+        # Users collection
+        database.users.create_indexes([
+            IndexModel([("email", ASCENDING)], unique=True)
+        ]),
+        # Notes collection
+        database.notes.create_indexes([
+            IndexModel([("subject", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("subject", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("upload_date", DESCENDING)])
+        ]),
+        # Questions collection
+        database.questions.create_indexes([
+            IndexModel([("note_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("subject", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)])
+        ]),
+        # Feedback collection
+        database.feedback.create_indexes([
+            IndexModel([("question_id", ASCENDING)])
+        ]),
+        # Suggested questions collection
+        database.suggested_questions.create_indexes([
+            IndexModel([("user_id", ASCENDING), ("is_completed", ASCENDING)])
+        ]),
+        # Learning analytics collection
+        database.learning_analytics.create_indexes([
+            IndexModel([("user_id", ASCENDING), ("subject", ASCENDING)])
+        ])
+    )
@@ -0,0 +1,26 @@
+from typing import Any, Iterable, List, Type
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+def _encode_bson(value):
+    """orjson fallback for BSON types it can't encode natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError
+
+class MongoJSONResponse(ORJSONResponse):
+    """ORJSONResponse that encodes ObjectIds itself, for routes returning documents directly."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_bson)
+
+def response_projection(model: Type[BaseModel]) -> dict:
+    """MongoDB projection for the fields of a response model."""
+    return {field: 1 for field in model.model_fields if field != "id"}
+
+def document_rows(documents: Iterable[dict], model: Type[BaseModel]) -> List[dict]:
+    """Shape documents as the model's fields, with _id as id and missing fields as null."""
+    fields = [field for field in model.model_fields if field != "id"]
+    return [{"id": document["_id"], **{field: document.get(field) for field in fields}} for document in documents]
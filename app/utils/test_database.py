@@ -0,0 +1,78 @@
+"""
+Offline tests for the ObjectId helpers in app.utils.database
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.utils import database
+from app.utils.database import get_object_id, serialize_deep, serialize_object_id
+
+OID = ObjectId("64b7f0c2a1b2c3d4e5f60718")
+
+def test_get_object_id_parses_hex_strings():
+    assert get_object_id("64b7f0c2a1b2c3d4e5f60718") == OID
+    assert get_object_id("64B7F0C2A1B2C3D4E5F60718") == OID
+
+def test_get_object_id_passes_object_ids_through():
+    assert get_object_id(OID) is OID
+
+@pytest.mark.parametrize("value", ["", "not-an-id", "64b7f0c2a1b2c3d4e5f6071", "64b7f0c2a1b2c3d4e5f6071z", None, 42])
+def test_get_object_id_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        get_object_id(value)
+
+def test_serialize_object_id_renames_and_stringifies():
+    note = {"_id": OID, "user_id": OID, "question_ids": [OID, "plain"], "title": "Fractions"}
+    assert serialize_object_id(note) == {
+        "id": str(OID),
+        "user_id": str(OID),
+        "question_ids": [str(OID), "plain"],
+        "title": "Fractions",
+    }
+    # The input document is left untouched
+    assert note["_id"] is OID
+
+def test_serialize_object_id_none():
+    assert serialize_object_id(None) is None
+
+def test_serialize_deep_converts_nested_values():
+    created = datetime(2024, 1, 2, 3, 4, 5)
+    result = serialize_deep({"_id": OID, "meta": {"owner": OID, "created_at": created}})
+    assert result == {"id": str(OID), "meta": {"owner": str(OID), "created_at": "2024-01-02T03:04:05"}}
+
+class RecordingClient:
+    """Stand-in Motor client that records close()"""
+    closed = False
+
+    def __getitem__(self, name):
+        return name
+
+    def close(self):
+        self.closed = True
+
+def test_clients_of_finished_loops_are_closed(monkeypatch):
+    created = []
+
+    def create_client():
+        created.append(RecordingClient())
+        return created[-1]
+
+    monkeypatch.setattr(database, "_create_client", create_client)
+    monkeypatch.setattr(database, "_clients", {})
+
+    async def use_database():
+        database.get_database()
+
+    asyncio.run(use_database())
+    asyncio.run(use_database())
+    assert len(created) == 2
+    assert created[0].closed
+    assert not created[1].closed
+    assert len(database._clients) == 1
+
+    database.close_database()
+    assert created[1].closed
+    assert not database._clients